@@ -0,0 +1,37 @@
+import random
+import timeit
+
+from benchmarks.bench_evaluation import random_positions
+from domain import bitboard
+from domain.computer_strategy import _playout
+from domain.evaluation import get_features
+from domain.position import Position
+
+SIZES = (6, 8, 10, 12)
+
+
+def main():
+    print(f'{"size":>4s} {"board moves":>12s} {"bitboard moves":>15s} {"features":>10s} {"playout":>10s}')
+    for size in SIZES:
+        # Stop a few plies short of a full board so that every size gets midgame positions
+        boards = random_positions(100, size * size // 2 - 4, size=size)
+        positions = [Position.from_board(board, symbol) for board, symbol in boards]
+        bits = [(position.player_bits, position.opponent_bits) for position in positions]
+        rng = random.Random(0)
+        # Build the line tables of the size before timing
+        get_features(*bits[0], size)
+
+        cases = [
+            lambda: [board.get_valid_moves(symbol) for board, symbol in boards],
+            lambda: [bitboard.get_moves(own, opp, size) for own, opp in bits],
+            lambda: [get_features(own, opp, size) for own, opp in bits],
+            lambda: [_playout(own, opp, rng, size) for own, opp in bits],
+        ]
+        number = 3
+        timings = [timeit.timeit(func, number=number) / number / len(boards) * 1e6 for func in cases]
+        print(f'{size:4d} ' + ' '.join(f'{timing:{width}.1f}' for timing, width in zip(timings, (12, 15, 10, 10)))
+              + '  us per position')
+
+
+if __name__ == '__main__':
+    main()
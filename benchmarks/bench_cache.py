@@ -0,0 +1,54 @@
+import concurrent.futures
+import os
+import tempfile
+import time
+
+from benchmarks.bench_evaluation import random_positions
+from domain.computer_strategy import ComputerMediumStrategy
+from domain.position import Position
+from domain.reversi_game import ReversiGame
+from repository.evaluation_cache import EvaluationCache
+
+
+def search_all(boards: list, cache: EvaluationCache) -> float:
+    """
+    Runs the medium strategy on every board.
+    :param boards: A list of (board, symbol to move) pairs.
+    :param cache: The evaluation cache used by the strategy.
+    :return: The average number of seconds per move.
+    """
+    start = time.perf_counter()
+    for board, symbol in boards:
+        game = ReversiGame('O' if symbol == 'X' else 'X', Position.from_board(board))
+        ComputerMediumStrategy(game, cache=cache).get_move(game.board, symbol)
+    return (time.perf_counter() - start) / len(boards)
+
+
+def write_entries(file_name: str, seed: int, count: int) -> int:
+    cache = EvaluationCache(file_name)
+    for i in range(count):
+        cache.put(Position(seed << 32 | i, 0), 3, float(i), (i % 8, i // 8 % 8))
+    return count
+
+
+def main():
+    boards = random_positions(20, 20, seed=1)
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'cache.db')
+
+        cold = search_all(boards, EvaluationCache(file_name))
+        # A new cache object on the same file stands for a restart of the program
+        warm = search_all(boards, EvaluationCache(file_name))
+        print(f'cold search:             {cold * 1000:8.2f} ms per move')
+        print(f'warm start after restart: {warm * 1000:8.2f} ms per move ({cold / warm:.0f}x faster)')
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as pool:
+            start = time.perf_counter()
+            written = sum(pool.map(write_entries, [file_name] * 4, range(1, 5), [500] * 4))
+            elapsed = time.perf_counter() - start
+        print(f'{written} concurrent writes from 4 processes in {elapsed:.2f} s, '
+              f'{len(EvaluationCache(file_name))} entries stored')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import random
+import timeit
+
+from domain import bitboard
+from domain.computer_strategy import ComputerMediumStrategy
+from domain.evaluation import get_features, get_mobility, get_stable
+from domain.position import Position
+from domain.reversi_board import ReversiBoard
+from domain.reversi_game import ReversiGame
+
+
+def random_positions(count: int, plies: int, seed: int = 0, size: int = 8) -> list:
+    """
+    Plays random games to collect midgame boards.
+    :param count: The number of boards to collect.
+    :param plies: The number of random moves played from the opening.
+    :param seed: The seed of the random generator.
+    :param size: The board size.
+    :return: A list of (board, symbol to move) pairs.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = ReversiBoard(size)
+        symbol = 'X'
+        for _ in range(plies):
+            moves = board.get_valid_moves(symbol)
+            if not moves:
+                break
+            board.make_move(*rng.choice(moves), symbol)
+            symbol = 'O' if symbol == 'X' else 'X'
+        else:
+            boards.append((board, symbol))
+    return boards
+
+
+def cell_by_cell_mobility(board: ReversiBoard, symbol: str) -> int:
+    opp_symbol = 'X' if symbol == 'O' else 'O'
+    own = sum(board.is_valid_move(r, c, symbol) for r in range(8) for c in range(8))
+    opp = sum(board.is_valid_move(r, c, opp_symbol) for r in range(8) for c in range(8))
+    return own - opp
+
+
+def main():
+    boards = random_positions(200, 30)
+    positions = [Position.from_board(board, symbol) for board, symbol in boards]
+    bits = [(position.player_bits, position.opponent_bits) for position in positions]
+    strategy = ComputerMediumStrategy(ReversiGame('X'))
+
+    cases = [
+        ('evaluate_board (discs + corners)', lambda: [strategy.evaluate_board(b, s) for b, s in boards]),
+        ('mobility, cell by cell', lambda: [cell_by_cell_mobility(b, s) for b, s in boards]),
+        ('mobility, bitboard', lambda: [get_mobility(own, opp) for own, opp in bits]),
+        ('frontier, bitboard', lambda: [bitboard.get_frontier(own, opp) for own, opp in bits]),
+        ('stable discs, tables', lambda: [get_stable(own, opp) for own, opp in bits]),
+        ('get_features, bitboards', lambda: [get_features(own, opp) for own, opp in bits]),
+        ('get_features, from a board', lambda: [strategy.get_features(b, s) for b, s in boards]),
+    ]
+    number = 5
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=number)
+        print(f'{name:34s} {seconds / number / len(boards) * 1e6:8.1f} us per leaf')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import copy
+import pickle
+import sys
+import timeit
+
+from domain.position import Position
+from domain.reversi_board import ReversiBoard
+
+
+def deep_size(obj, seen=None) -> int:
+    """
+    Approximates the memory held by an object and everything it references.
+    :param obj: The object to be measured.
+    :param seen: The ids of the objects already counted.
+    :return: The size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, str) and len(obj) <= 1:
+        # Single character strings are shared by the interpreter, not owned by the object
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    if hasattr(obj, '__dict__'):
+        size += deep_size(obj.__dict__, seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def main():
+    board = ReversiBoard()
+    position = Position.from_board(board)
+    board_size = deep_size(board)
+    position_size = deep_size(position)
+    bytes_size = sys.getsizeof(position.to_bytes())
+
+    print(f'ReversiBoard:        {board_size:5d} bytes')
+    print(f'Position:            {position_size:5d} bytes ({board_size / position_size:.1f}x smaller)')
+    print(f'Position.to_bytes(): {bytes_size:5d} bytes ({board_size / bytes_size:.1f}x smaller)')
+
+    number = 20000
+    timings = [
+        ('deepcopy(ReversiBoard)', lambda: copy.deepcopy(board)),
+        ('ReversiBoard.copy()', board.copy),
+        ('pickle(ReversiBoard)', lambda: pickle.dumps(board)),
+        ('pickle(Position)', lambda: pickle.dumps(position)),
+        ('Position.to_bytes()', position.to_bytes),
+        ('Position.from_bytes()', lambda: Position.from_bytes(position.to_bytes())),
+        ('Position.from_board()', lambda: Position.from_board(board)),
+        ('Position.to_board()', position.to_board),
+    ]
+    for name, func in timings:
+        seconds = timeit.timeit(func, number=number)
+        print(f'{name:24s} {seconds / number * 1e6:8.2f} us')
+    print(f'pickled sizes: ReversiBoard {len(pickle.dumps(board))} bytes, Position {len(pickle.dumps(position))} bytes')
+
+
+if __name__ == '__main__':
+    main()
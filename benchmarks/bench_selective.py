@@ -0,0 +1,129 @@
+import argparse
+import random
+import time
+
+from domain.computer_strategy import ComputerMediumStrategy
+from domain.position import Position
+from domain.reversi_board import ReversiBoard
+from domain.reversi_game import ReversiGame
+from repository.probcut_parameters import ProbCutParameters
+
+
+class FixedTimeClock:
+    """
+    A game clock that gives every move the same time, so that strategies are compared at equal cost.
+    """
+
+    def __init__(self, seconds: float):
+        self._seconds = seconds
+
+    def start_move(self) -> None:
+        pass
+
+    def end_move(self) -> float:
+        return 0.0
+
+    def allocate(self, legal_moves: int, empties: int) -> tuple:
+        return self._seconds, self._seconds
+
+
+def random_openings(count: int, plies: int, seed: int) -> list:
+    """
+    Plays random openings, so that the games of a match do not all repeat the same moves.
+    :return: A list of positions with black to move.
+    """
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        board = ReversiBoard()
+        symbol = 'X'
+        for _ in range(plies):
+            moves = board.get_valid_moves(symbol)
+            if not moves:
+                break
+            board.make_move(*rng.choice(moves), symbol)
+            symbol = 'O' if symbol == 'X' else 'X'
+        else:
+            if symbol == 'X':
+                openings.append(Position.from_board(board))
+    return openings
+
+
+def play_game(black: dict, white: dict, opening: Position, seconds: float) -> tuple:
+    """
+    Plays a game between two configurations of the medium strategy.
+    :param black: The keyword arguments of the black strategy.
+    :param white: The keyword arguments of the white strategy.
+    :param opening: The position the game starts from.
+    :param seconds: The time per move.
+    :return: The final disc difference for black, and the lists of the (depth, nodes per second) of the moves
+    of black and white.
+    """
+    # One game per side, each playing the other side's moves as the human ones
+    games = {'X': ReversiGame('O', opening), 'O': ReversiGame('X', opening)}
+    for symbol, config in (('X', black), ('O', white)):
+        games[symbol].set_clock(FixedTimeClock(seconds))
+        games[symbol].set_computer_strategy(ComputerMediumStrategy(games[symbol], **config))
+    searches = {'X': [], 'O': []}
+
+    symbol = 'X'
+    while not games['X'].is_game_over():
+        other = 'O' if symbol == 'X' else 'X'
+        if games[symbol].get_valid_moves(symbol):
+            move = games[symbol].play_computer_move()
+            games[other].play_human_move(*move)
+            stats = games[symbol].computer_strategy.stats
+            if stats.get('nodes'):
+                searches[symbol].append((stats['depth'], stats['nodes'] / max(stats['seconds'], 1e-9)))
+        symbol = other
+
+    score = games['X'].get_score()
+    return score['X'] - score['O'], searches['X'], searches['O']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays selective search configurations against plain alpha-beta '
+                                                 'at a fixed time per move.')
+    parser.add_argument('--games', type=int, default=8, help='games per configuration, half of them as black')
+    parser.add_argument('--seconds', type=float, default=0.2, help='time per move')
+    parser.add_argument('--probcut-file', default='probcut.properties')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    probcut = ProbCutParameters.load(args.probcut_file)
+    plain = {}
+    configs = [
+        ('probcut', {'probcut': probcut}),
+        ('late move reductions', {'late_move_reductions': True}),
+        ('probcut + reductions', {'probcut': probcut, 'late_move_reductions': True}),
+    ]
+    openings = random_openings((args.games + 1) // 2, 4, args.seed)
+
+    print(f'{"configuration":22s} {"score":>7s} {"discs":>7s} {"depth":>12s} {"nodes/s":>16s}')
+    for name, config in configs:
+        start = time.perf_counter()
+        points = discs = 0.0
+        own, base = [], []
+        for game in range(args.games):
+            opening = openings[game // 2]
+            if game % 2 == 0:
+                diff, config_searches, plain_searches = play_game(config, plain, opening, args.seconds)
+            else:
+                diff, plain_searches, config_searches = play_game(plain, config, opening, args.seconds)
+                diff = -diff
+            points += 1.0 if diff > 0 else 0.5 if diff == 0 else 0.0
+            discs += diff
+            own.extend(config_searches)
+            base.extend(plain_searches)
+
+        def average(searches, index):
+            return sum(search[index] for search in searches) / max(len(searches), 1)
+
+        print(f'{name:22s} {points / args.games:6.0%} {discs / args.games:+7.1f} '
+              f'{average(own, 0):5.2f} / {average(base, 0):4.2f} {average(own, 1):7.0f} / {average(base, 1):6.0f}'
+              f'  ({time.perf_counter() - start:.0f} s)')
+    print('score, disc difference, average depth and nodes per second against plain alpha-beta')
+
+
+if __name__ == '__main__':
+    main()
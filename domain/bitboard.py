@@ -0,0 +1,210 @@
+"""
+Bitboard helpers for square boards. Bit (row * size + col) of a bitboard is set when the cell holds a disc,
+the same layout as Position uses. Every function takes the board size, 8 by default.
+"""
+
+# (row, col) steps, in the same order as the ray tables of ReversiBoard
+DIRECTIONS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+# size -> (full board mask, (bit shift, mask of the cells a disc may land on) per direction, corner mask)
+_GEOMETRIES = {}
+
+
+def get_geometry(size: int) -> tuple:
+    """
+    Gets the masks of a board size, built on first use and then shared.
+    :param size: The number of rows (and columns) of the board.
+    :return: A (full board mask, shifts, corner mask) tuple, the shifts holding a (bit shift, landing mask)
+    pair for every direction of DIRECTIONS.
+    """
+    geometry = _GEOMETRIES.get(size)
+    if geometry is None:
+        full = (1 << (size * size)) - 1
+        first_col = sum(1 << (row * size) for row in range(size))
+        not_first_col = full & ~first_col
+        not_last_col = full & ~(first_col << (size - 1))
+        shifts = tuple((dr * size + dc, not_first_col if dc > 0 else not_last_col if dc < 0 else full)
+                       for dr, dc in DIRECTIONS)
+        corners = 1 | 1 << (size - 1) | 1 << (size * (size - 1)) | 1 << (size * size - 1)
+        geometry = _GEOMETRIES[size] = (full, shifts, corners)
+    return geometry
+
+
+FULL, _SHIFTS, CORNERS = get_geometry(8)
+
+
+def get_full(size: int = 8) -> int:
+    """
+    Gets the mask of every cell of a board.
+    :param size: The board size.
+    :return: The full board mask.
+    """
+    return get_geometry(size)[0]
+
+
+def get_corners(size: int = 8) -> int:
+    """
+    Gets the mask of the four corners of a board.
+    :param size: The board size.
+    :return: The corner mask.
+    """
+    return get_geometry(size)[2]
+
+
+def shift(bits: int, direction: int, size: int = 8) -> int:
+    """
+    Moves every disc of a bitboard one cell in a direction, dropping the ones that leave the board.
+    :param bits: The bitboard.
+    :param direction: The index of the direction in DIRECTIONS.
+    :param size: The board size.
+    :return: The shifted bitboard.
+    """
+    amount, mask = get_geometry(size)[1][direction]
+    if amount > 0:
+        return (bits << amount) & mask
+    return (bits >> -amount) & mask
+
+
+def get_moves(own: int, opp: int, size: int = 8) -> int:
+    """
+    Computes the legal moves of a player.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: A bitboard with a bit set on every legal move.
+    """
+    if size != 8:
+        return _get_moves(own, opp, size)
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for amount, mask in _SHIFTS:
+        opp_mask = opp & mask
+        # A run of opponent discs between a disc and a move is at most 6 long, so the fill is unrolled 6 times
+        if amount > 0:
+            candidates = (own << amount) & opp_mask
+            candidates |= (candidates << amount) & opp_mask
+            candidates |= (candidates << amount) & opp_mask
+            candidates |= (candidates << amount) & opp_mask
+            candidates |= (candidates << amount) & opp_mask
+            candidates |= (candidates << amount) & opp_mask
+            moves |= (candidates << amount) & mask & empty
+        else:
+            amount = -amount
+            candidates = (own >> amount) & opp_mask
+            candidates |= (candidates >> amount) & opp_mask
+            candidates |= (candidates >> amount) & opp_mask
+            candidates |= (candidates >> amount) & opp_mask
+            candidates |= (candidates >> amount) & opp_mask
+            candidates |= (candidates >> amount) & opp_mask
+            moves |= (candidates >> amount) & mask & empty
+    return moves
+
+
+def _get_moves(own: int, opp: int, size: int) -> int:
+    # The same fill as get_moves, looped (size - 2) times for board sizes other than 8
+    full, shifts, _ = get_geometry(size)
+    empty = ~(own | opp) & full
+    fills = range(size - 3)
+    moves = 0
+    for amount, mask in shifts:
+        opp_mask = opp & mask
+        if amount > 0:
+            candidates = (own << amount) & opp_mask
+            for _ in fills:
+                candidates |= (candidates << amount) & opp_mask
+            moves |= (candidates << amount) & mask & empty
+        else:
+            amount = -amount
+            candidates = (own >> amount) & opp_mask
+            for _ in fills:
+                candidates |= (candidates >> amount) & opp_mask
+            moves |= (candidates >> amount) & mask & empty
+    return moves
+
+
+def get_flips(own: int, opp: int, square: int, size: int = 8) -> int:
+    """
+    Computes the discs flipped by playing a move.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param square: The index (row * size + col) of the move.
+    :param size: The board size.
+    :return: A bitboard of the flipped discs (empty if the move flips nothing).
+    """
+    move = 1 << square
+    flips = 0
+    for amount, mask in get_geometry(size)[1]:
+        line = 0
+        if amount > 0:
+            cell = (move << amount) & mask
+            while cell & opp:
+                line |= cell
+                cell = (cell << amount) & mask
+        else:
+            cell = (move >> -amount) & mask
+            while cell & opp:
+                line |= cell
+                cell = (cell >> -amount) & mask
+        if cell & own:
+            flips |= line
+    return flips
+
+
+def make_move(own: int, opp: int, square: int, size: int = 8) -> tuple:
+    """
+    Plays a move without checking that it is legal.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param square: The index (row * size + col) of the move.
+    :param size: The board size.
+    :return: The new (own, opp) bitboards.
+    """
+    flips = get_flips(own, opp, square, size)
+    return own | flips | (1 << square), opp & ~flips
+
+
+def get_neighbours(bits: int, size: int = 8) -> int:
+    """
+    Computes the cells adjacent to at least one disc of a bitboard.
+    :param bits: The bitboard.
+    :param size: The board size.
+    :return: The bitboard of the adjacent cells.
+    """
+    neighbours = 0
+    for amount, mask in get_geometry(size)[1]:
+        if amount > 0:
+            neighbours |= (bits << amount) & mask
+        else:
+            neighbours |= (bits >> -amount) & mask
+    return neighbours
+
+
+def get_frontier(own: int, opp: int, size: int = 8) -> int:
+    """
+    Computes the frontier discs of a player, i.e. the discs that touch an empty cell.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: The bitboard of the frontier discs.
+    """
+    return get_neighbours(~(own | opp) & get_full(size), size) & own
+
+
+def iter_squares(bits: int):
+    """
+    Iterates over the indices of the set bits, from the lowest to the highest.
+    :param bits: The bitboard.
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def count(bits: int) -> int:
+    """
+    Counts the set bits of a bitboard.
+    :param bits: The bitboard.
+    :return: The number of discs.
+    """
+    return bits.bit_count()
@@ -1,8 +1,15 @@
+import concurrent.futures
 import copy
+import math
 import random
+import sys
+import time
 
+from domain import bitboard, endgame
+from domain.evaluation import get_features
+from domain.position import Position
 from domain.reversi_board import ReversiBoard
-from exceptions.exceptions import NoValidMovesException, InvalidMoveException
+from exceptions.exceptions import NoValidMovesException, InvalidMoveException, SearchTimeoutException
 
 
 class ComputerStrategy:
@@ -25,6 +32,16 @@ class ComputerStrategy:
             raise NoValidMovesException("No valid moves for computer. Skipping its turn.")
         return random.choice(valid_moves)
 
+    def get_features(self, board: ReversiBoard, symbol: str) -> dict:
+        """
+        Gets the evaluation features of a board state from the point of view of a player.
+        :param board: The board state.
+        :param symbol: The symbol of the player.
+        :return: A dictionary with the disc, mobility, frontier, stable disc and corner differences.
+        """
+        position = Position.from_board(board, symbol)
+        return get_features(position.player_bits, position.opponent_bits, position.size)
+
 class ComputerHardStrategy(ComputerStrategy):
     def __init__(self, game):
         """
@@ -82,7 +99,8 @@ class ComputerHardStrategy(ComputerStrategy):
         :param move: The move to be checked.
         :return: True if the move is a corner move, False otherwise.
         """
-        return move in [(0, 0), (0, 7), (7, 0), (7, 7)]
+        last = self._game.board.size - 1
+        return move in [(0, 0), (0, last), (last, 0), (last, last)]
 
     def check_win(self, symbol: str, board: ReversiBoard) -> bool:
         """
@@ -100,7 +118,7 @@ class ComputerHardStrategy(ComputerStrategy):
                 elif cell == opp_symbol:
                     temp_score[opp_symbol] += 1
 
-        if temp_score[symbol] + temp_score[opp_symbol] == 64 and temp_score[symbol] > temp_score[opp_symbol]:
+        if temp_score[symbol] + temp_score[opp_symbol] == board.size ** 2 and temp_score[symbol] > temp_score[opp_symbol]:
             return True
         if temp_score[opp_symbol] == 0:
             return True
@@ -128,13 +146,14 @@ class ComputerHardStrategy(ComputerStrategy):
         :param move: The move to be checked.
         :return: The total number of opponent flips that will be made.
         """
+        size = self._game.board.size
         flips = 0
         for direction in self._directions:
             dir_flips = 0
             row, col = move
             row += direction[0]
             col += direction[1]
-            while 0 <= row < 8 and 0 <= col < 8:
+            while 0 <= row < size and 0 <= col < size:
                 if self._game.get_cell_value(row, col) == self._opp_symbol:
                     dir_flips += 1
                     row += direction[0]
@@ -147,18 +166,67 @@ class ComputerHardStrategy(ComputerStrategy):
         return flips
 
 class ComputerMediumStrategy(ComputerStrategy):
-    def __init__(self, game, depth = 3):
+    # Iterative deepening does not start a new depth unless it is expected to finish within twice the soft limit
+    _BRANCHING_FACTOR = 4
+    # Extra share of the soft time limit granted when the best move changes between two depths
+    _INSTABILITY_EXTENSION = 1.5
+    # Late-move reductions search the first moves of a node in full and only reduce nodes this deep
+    _LMR_FULL_MOVES = 3
+    _LMR_MIN_DEPTH = 3
+    # size -> priority of every square, see order_moves
+    _SQUARE_PRIORITIES = {}
+
+    def __init__(self, game, depth = 3, cache = None, endgame_empties = 10, weights = None, probcut = None,
+                 late_move_reductions = False):
         """
         Constructor for ComputerMediumStrategy class.
         :param game: The Othello game that the strategy will be used for.
-        :param depth: The depth of the minimax algorithm.
+        :param depth: The depth of the minimax algorithm when the game is not played on a clock.
+        :param cache: The persistent evaluation cache consulted before searching (None to always search).
+        :param endgame_empties: The number of empty cells from which a timed game tries to solve the position
+        exactly instead of searching it to a fixed depth.
+        :param weights: The trained EvaluationWeights used to evaluate the boards (None for the disc and corner
+        count).
+        :param probcut: The ProbCutParameters used to cut nodes selectively (None to disable ProbCut).
+        :param late_move_reductions: True to search the moves after the first few of a node one ply shallower.
         """
         super().__init__(game)
+        if weights is not None and weights.size != game.board.size:
+            raise ValueError(f'The weights were trained for {weights.size}x{weights.size} boards.')
         self._depth = depth
+        self._cache = cache
+        self._endgame_empties = endgame_empties
+        self._weights = weights
+        self._probcut = probcut
+        self._late_move_reductions = late_move_reductions
+        # Cached results are only reused by searches evaluating and pruning the same way
+        tags = []
+        if weights is not None:
+            tags.append(f'weights={weights.digest}')
+        if probcut is not None:
+            tags.append(f'probcut={probcut.digest}')
+        if late_move_reductions:
+            tags.append('lmr')
+        self._cache_namespace = ','.join(tags)
+        # Depth reached by the last timed search, which the next one is expected to reach as well
+        self._timed_depth = None
+        self._deadline = None
+        self._nodes = self._probcut_cuts = self._reductions = self._re_searches = 0
+        self._stats = {}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Statistics about the last search: the depth reached, the time used and the time allocated, the number of
+        nodes searched, and how many nodes ProbCut cut and late-move reductions reduced and searched again. A move
+        taken from the evaluation cache is marked as cached, with the depth of the stored search.
+        """
+        return self._stats
 
     def get_move(self, board: ReversiBoard, symbol: str) -> tuple:
         """
-        Gets the best move that the computer will make using the minimax algorithm.
+        Gets the best move that the computer will make using the minimax algorithm. Without a game clock the
+        search goes to a fixed depth; with one, it deepens iteratively within the time the clock allocates.
         :param board: The current board state.
         :param symbol: The symbol of the computer player.
         :return: The move that the computer will make.
@@ -166,78 +234,276 @@ class ComputerMediumStrategy(ComputerStrategy):
         valid_moves = self._game.get_valid_moves(symbol)
         if not valid_moves:
             raise NoValidMovesException("No valid moves for computer. Skipping its turn.")
+        if len(valid_moves) == 1:
+            self._stats = {'depth': 0, 'seconds': 0.0, 'budget': 0.0}
+            return valid_moves[0]
+
+        position = Position.from_board(board, symbol)
+        clock = self._game.clock
+        if clock is None:
+            expected_depth = self._depth
+        elif position.empties <= self._endgame_empties:
+            # The exact solver beats any cached search result
+            expected_depth = None
+        else:
+            expected_depth = self._timed_depth
+        if self._cache is not None and expected_depth is not None:
+            cached = self._cache.get(position, self._cache_namespace)
+            if cached is not None:
+                depth, _, move = cached
+                if depth >= expected_depth and move in valid_moves:
+                    self._stats = {'depth': depth, 'seconds': 0.0, 'budget': None, 'cached': True}
+                    return move
+
+        start = time.perf_counter()
+        self._nodes = self._probcut_cuts = self._reductions = self._re_searches = 0
+        if clock is None:
+            best_move, best_score = self.search_root(board, symbol, valid_moves, self._depth)
+            depth, budget = self._depth, None
+        else:
+            best_move, best_score, depth, budget = self.search_timed(board, symbol, valid_moves, position, clock)
+            if position.empties > self._endgame_empties:
+                self._timed_depth = depth
+        self._stats = {'depth': depth, 'seconds': time.perf_counter() - start, 'budget': budget,
+                       'nodes': self._nodes, 'probcut_cuts': self._probcut_cuts, 'reductions': self._reductions,
+                       're_searches': self._re_searches}
+
+        if self._cache is not None and depth > 0:
+            self._cache.put(position, depth, best_score, best_move, self._cache_namespace)
+        return best_move
+
+    def search_timed(self, board: ReversiBoard, symbol: str, valid_moves: list, position: Position,
+                     clock) -> tuple:
+        """
+        Searches within the time allocated by the game clock: near the end of the game it first tries to solve the
+        position exactly, otherwise (or if that does not finish in time) it deepens iteratively, moving the best
+        move found so far to the front and allowing more time when the best move keeps changing.
+        :param board: The current board state.
+        :param symbol: The symbol of the computer player.
+        :param valid_moves: The valid moves of the computer player.
+        :param position: The position of the board, with the computer player to move.
+        :param clock: The game clock of the computer player.
+        :return: A (best move, score, depth reached, soft time limit) tuple. The depth is 0 if only the one-ply
+        iteration, which ignores the deadline, finished, and the number of empty cells if the position was solved.
+        """
+        start = time.perf_counter()
+        empties = position.empties
+        soft, hard = clock.allocate(len(valid_moves), empties)
+        deadline = start + hard
+        self._deadline = deadline
+        try:
+            if empties <= self._endgame_empties:
+                try:
+                    square, score = endgame.solve(position.player_bits, position.opponent_bits, self._deadline,
+                                                  position.size)
+                    return divmod(square, position.size), score, empties, soft
+                except SearchTimeoutException:
+                    pass
 
+            best_move, best_score, reached = valid_moves[0], float('-inf'), 0
+            for depth in range(empties):
+                iteration_start = time.perf_counter()
+                # The one-ply iteration always finishes, so the move is never picked without any evaluation
+                self._deadline = deadline if depth else None
+                try:
+                    move, score = self.search_root(board, symbol, valid_moves, depth)
+                except SearchTimeoutException:
+                    break
+                if reached and move != best_move:
+                    soft = min(soft * self._INSTABILITY_EXTENSION, hard)
+                best_move, best_score, reached = move, score, depth
+                valid_moves = [move] + [other for other in valid_moves if other != move]
+
+                now = time.perf_counter()
+                next_iteration = (now - iteration_start) * self._BRANCHING_FACTOR
+                if now - start >= soft or now + next_iteration > min(deadline, start + 2 * soft):
+                    break
+            return best_move, best_score, reached, soft
+        finally:
+            self._deadline = None
+
+    def search_root(self, board: ReversiBoard, symbol: str, valid_moves: list, depth: int) -> tuple:
+        """
+        Scores every valid move of the computer player with the minimax algorithm.
+        :param board: The current board state.
+        :param symbol: The symbol of the computer player.
+        :param valid_moves: The moves to be scored, best candidates first.
+        :param depth: The depth of the minimax algorithm below the moves.
+        :return: The best move and its score.
+        """
         best_move = valid_moves[0]
         best_score = float('-inf')
 
         for move in valid_moves:
-            board_copy = copy.deepcopy(board)
+            board_copy = board.copy()
             row, col = move
             try:
                 board_copy.make_move(row, col, symbol)
-                score = self.minimax(board_copy, self._depth, False, symbol)
+                score = self.minimax(board_copy, depth, False, symbol, best_score)
                 if score > best_score:
                     best_score = score
                     best_move = move
             except InvalidMoveException:
                 continue
-        return best_move
+        return best_move, best_score
 
-    def minimax(self, board: ReversiBoard, depth: int, maximizing: bool, symbol: str) -> int:
+    def minimax(self, board: ReversiBoard, depth: int, maximizing: bool, symbol: str,
+                alpha: float = float('-inf'), beta: float = float('inf')) -> int:
         """
-        The minimax algorithm. It will recursively evaluate the board state to find the best move.
+        The minimax algorithm with alpha-beta pruning. It will recursively evaluate the board state to find the
+        best move. With ProbCut, a node is cut when a shallow search predicts its score to fall well outside the
+        window; with late-move reductions, the moves after the first few are first searched one ply shallower.
         :param board: The current board state.
         :param depth: The remaining depth of the algorithm. The algorithm will stop when depth is 0.
         :param maximizing: True if the current layer is maximizing (trying to get the highest score),
          False if it is minimizing (simulating the opponent's turn).
         :param symbol: The symbol of the computer player.
+        :param alpha: The score the computer player is already sure to get.
+        :param beta: The score the opponent is already sure to hold the computer player to.
         :return: The score of the board state (a higher score is better for the computer player).
         """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeoutException('The search ran out of time.')
+        self._nodes += 1
+
         opp_symbol = 'X' if symbol == 'O' else 'O'
-        valid_moves = self._game.get_valid_moves(symbol if maximizing else opp_symbol)
+        valid_moves = board.get_valid_moves(symbol if maximizing else opp_symbol)
 
         if depth == 0 or not valid_moves:
             return self.evaluate_board(board, symbol)
 
+        if self._probcut is not None:
+            cut = self.probcut(board, depth, maximizing, symbol, alpha, beta)
+            if cut is not None:
+                return cut
+        reduce = self._late_move_reductions and depth >= self._LMR_MIN_DEPTH
+        if reduce:
+            valid_moves = self.order_moves(valid_moves, board.size)
+
         if maximizing: # Computer's turn
             max_score = float('-inf')
-            for move in valid_moves:
-                board_copy = copy.deepcopy(board)
+            for index, move in enumerate(valid_moves):
+                board_copy = board.copy()
                 row, col = move
                 try:
                     board_copy.make_move(row, col, symbol)
-                    score = self.minimax(board_copy, depth - 1, False, symbol)
+                    score = None
+                    if reduce and index >= self._LMR_FULL_MOVES and alpha > float('-inf'):
+                        # A late move only needs a full search if a shallower one says it might beat alpha
+                        self._reductions += 1
+                        score = self.minimax(board_copy, depth - 2, False, symbol, alpha,
+                                             math.nextafter(alpha, math.inf))
+                        if score > alpha:
+                            self._re_searches += 1
+                            score = None
+                    if score is None:
+                        score = self.minimax(board_copy, depth - 1, False, symbol, alpha, beta)
                     max_score = max(max_score, score)
+                    alpha = max(alpha, score)
+                    if alpha >= beta:
+                        break
                 except InvalidMoveException:
                     continue
             return max_score
         else: # Simulate opponent's best move (in order to minimize the score for the next recursive step)
             min_score = float('inf')
-            for move in valid_moves:
-                board_copy = copy.deepcopy(board)
+            for index, move in enumerate(valid_moves):
+                board_copy = board.copy()
                 row, col = move
                 try:
                     board_copy.make_move(row, col, opp_symbol)
-                    score = self.minimax(board_copy, depth - 1, True, symbol)
+                    score = None
+                    if reduce and index >= self._LMR_FULL_MOVES and beta < float('inf'):
+                        self._reductions += 1
+                        score = self.minimax(board_copy, depth - 2, True, symbol, math.nextafter(beta, -math.inf),
+                                             beta)
+                        if score < beta:
+                            self._re_searches += 1
+                            score = None
+                    if score is None:
+                        score = self.minimax(board_copy, depth - 1, True, symbol, alpha, beta)
                     min_score = min(min_score, score)
+                    beta = min(beta, score)
+                    if alpha >= beta:
+                        break
                 except InvalidMoveException:
                     continue
             return min_score
 
-    def evaluate_board(self, board: ReversiBoard, symbol: str) -> int:
+    def probcut(self, board: ReversiBoard, depth: int, maximizing: bool, symbol: str, alpha: float, beta: float):
+        """
+        Tries to cut a node with ProbCut: a shallow search tests whether the score of the deep one is very likely
+        to fail high (above beta) at a maximizing node or low (below alpha) at a minimizing node.
+        :param board: The current board state.
+        :param depth: The remaining depth of the node.
+        :param maximizing: True if the node is maximizing.
+        :param symbol: The symbol of the computer player.
+        :param alpha: The score the computer player is already sure to get.
+        :param beta: The score the opponent is already sure to hold the computer player to.
+        :return: The bound the node is cut with, or None if it has to be searched.
+        """
+        regression = self._probcut.get(depth)
+        if regression is None:
+            return None
+        shallow, slope, intercept, deviation = regression
+        margin = self._probcut.threshold * deviation
+        if maximizing and beta < float('inf'):
+            # deep >= beta + margin is predicted when shallow >= bound
+            bound = (beta + margin - intercept) / slope
+            if self.minimax(board, shallow, True, symbol, math.nextafter(bound, -math.inf), bound) >= bound:
+                self._probcut_cuts += 1
+                return beta
+        elif not maximizing and alpha > float('-inf'):
+            bound = (alpha - margin - intercept) / slope
+            if self.minimax(board, shallow, False, symbol, bound, math.nextafter(bound, math.inf)) <= bound:
+                self._probcut_cuts += 1
+                return alpha
+        return None
+
+    @classmethod
+    def order_moves(cls, moves: list, size: int) -> list:
+        """
+        Orders moves from the most to the least promising by the kind of square they are played on: corners,
+        then edges, then the inner squares, then the squares next to the corners.
+        :param moves: The (row, col) moves.
+        :param size: The board size.
+        :return: The ordered moves.
+        """
+        priorities = cls._SQUARE_PRIORITIES.get(size)
+        if priorities is None:
+            last = size - 1
+            priorities = [[2] * size for _ in range(size)]
+            for row in range(size):
+                for col in range(size):
+                    if row in (0, last) or col in (0, last):
+                        priorities[row][col] = 1
+            for row, col, dr, dc in ((0, 0, 1, 1), (0, last, 1, -1), (last, 0, -1, 1), (last, last, -1, -1)):
+                priorities[row][col] = 0
+                priorities[row][col + dc] = priorities[row + dr][col] = 3
+                priorities[row + dr][col + dc] = 4
+            priorities = cls._SQUARE_PRIORITIES[size] = priorities
+        return sorted(moves, key=lambda move: priorities[move[0]][move[1]])
+
+    def evaluate_board(self, board: ReversiBoard, symbol: str) -> float:
         """
-        Evaluates the board state in order to determine how favorable it is for the computer player.
+        Evaluates the board state in order to determine how favorable it is for the computer player, with the
+        trained weights if the strategy has them.
         :param board: The current board state.
         :param symbol: The symbol of the computer player.
         :return: The score of the board state. A higher score is better for the computer player.
         """
+        if self._weights is not None:
+            position = Position.from_board(board, symbol)
+            return self._weights.evaluate(position.player_bits, position.opponent_bits)
+
         opp_symbol = 'X' if symbol == 'O' else 'O'
         computer_score = sum([row.count(symbol) for row in board.data])
         human_score = sum([row.count(opp_symbol) for row in board.data])
 
         # Weight corners more (they are permanent and cannot be flipped)
         corner_weight = 10
-        corners = [(0, 0), (0, 7), (7, 0), (7, 7)]
+        last = board.size - 1
+        corners = [(0, 0), (0, last), (last, 0), (last, last)]
         for corner in corners:
             row, col = corner
             if board.data[row][col] == symbol:
@@ -246,3 +512,289 @@ class ComputerMediumStrategy(ComputerStrategy):
                 human_score += corner_weight
 
         return computer_score - human_score
+
+
+def _playout(own: int, opp: int, rng: random.Random, size: int = 8) -> float:
+    """
+    Plays random moves until the end of the game.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param rng: The random generator choosing the moves.
+    :param size: The board size.
+    :return: 1 if the player to move wins, 0.5 for a draw and 0 for a loss.
+    """
+    side = 0
+    passes = 0
+    while passes < 2:
+        moves = bitboard.get_moves(own, opp, size)
+        if moves:
+            passes = 0
+            squares = list(bitboard.iter_squares(moves))
+            own, opp = bitboard.make_move(own, opp, squares[rng.randrange(len(squares))], size)
+        else:
+            passes += 1
+        own, opp = opp, own
+        side ^= 1
+    if side:
+        own, opp = opp, own
+    diff = bitboard.count(own) - bitboard.count(opp)
+    return 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+
+
+def _playout_batch(own: int, opp: int, count: int, seed: int, size: int = 8) -> float:
+    """
+    Runs a batch of playouts from the same position. Module level so that it can run in a worker process.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param count: The number of playouts.
+    :param seed: The seed of the random generator.
+    :param size: The board size.
+    :return: The sum of the playout results for the player to move.
+    """
+    rng = random.Random(seed)
+    return sum(_playout(own, opp, rng, size) for _ in range(count))
+
+
+class MctsNode:
+    """
+    A node of the Monte Carlo search tree. The wins are counted for the player who moved into the node.
+    """
+    __slots__ = ('own', 'opp', 'move', 'parent', 'children', 'visits', 'wins', 'prior')
+
+    def __init__(self, own: int, opp: int, move, parent, prior: float = 0.0):
+        """
+        Constructor for MctsNode class.
+        :param own: The bitboard of the player to move.
+        :param opp: The bitboard of the opponent.
+        :param move: The square played to reach the node (None for a pass or for the root).
+        :param parent: The parent node (None for the root).
+        :param prior: The heuristic value of the move, used as a progressive bias.
+        """
+        self.own = own
+        self.opp = opp
+        self.move = move
+        self.parent = parent
+        self.children = None
+        self.visits = 0
+        self.wins = 0.0
+        self.prior = prior
+
+
+class ComputerMctsStrategy(ComputerStrategy):
+    def __init__(self, game, time_limit: float = 1.0, workers: int = 0, batch_size: int = 8,
+                 max_nodes: int = 200000, exploration: float = 1.4, bias: float = 1.0):
+        """
+        Constructor for ComputerMctsStrategy class.
+        :param game: The Othello game that the strategy will be used for.
+        :param time_limit: The number of seconds the search may use per move, when the game is not played on a clock.
+        :param workers: The number of worker processes running the playouts (0 runs them in this process).
+        :param batch_size: The number of playouts run from every new leaf (per worker process).
+        :param max_nodes: The number of tree nodes above which unvisited branches are pruned.
+        :param exploration: The UCT exploration constant.
+        :param bias: The weight of the corner/mobility prior, which fades as a move gets visited.
+        """
+        super().__init__(game)
+        self._time_limit = time_limit
+        self._workers = workers
+        self._batch_size = batch_size
+        self._max_nodes = max_nodes
+        self._exploration = exploration
+        self._bias = bias
+        self._size = game.board.size
+        # Squares diagonally adjacent to an empty corner hand the corner to the opponent
+        size, last = self._size, self._size - 1
+        self._x_squares = {size + 1: 0, size + last - 1: last, size * (last - 1) + 1: size * last,
+                           size * (last - 1) + last - 1: size * size - 1}
+        self._rng = random.Random()
+        self._pool = None
+        self._root = None
+        self._node_count = 0
+        self._pruned = False
+        self._stats = {}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Statistics about the last search: playouts, playouts per second, tree nodes and tree memory.
+        """
+        return self._stats
+
+    def get_move(self, board: ReversiBoard, symbol: str) -> tuple:
+        """
+        Gets the move that the computer will make using a Monte Carlo tree search.
+        :param board: The current board state.
+        :param symbol: The symbol of the computer player.
+        :return: The move that the computer will make.
+        """
+        valid_moves = self._game.get_valid_moves(symbol)
+        if not valid_moves:
+            raise NoValidMovesException("No valid moves for computer. Skipping its turn.")
+        if len(valid_moves) == 1:
+            self._root = None
+            self._stats = {}
+            return valid_moves[0]
+
+        position = Position.from_board(board, symbol)
+        self._set_root(position.player_bits, position.opponent_bits)
+        self._pruned = False
+        time_limit = self._time_limit
+        if self._game.clock is not None:
+            time_limit, _ = self._game.clock.allocate(len(valid_moves), position.empties)
+        # A new root is only simulated on its first visit, so it is expanded up front: however short the budget,
+        # there are children to choose the move from
+        if not self._root.children:
+            self._expand(self._root)
+        start = time.perf_counter()
+        deadline = start + time_limit
+        playouts = self._iterate()
+        while time.perf_counter() < deadline:
+            playouts += self._iterate()
+        elapsed = time.perf_counter() - start
+
+        best = max(self._root.children, key=lambda child: child.visits)
+        self._stats = {
+            'playouts': playouts,
+            'playouts_per_second': playouts / elapsed if elapsed else 0.0,
+            'tree_nodes': self._node_count,
+            'tree_memory': self._node_count * _NODE_SIZE,
+            'win_rate': best.wins / best.visits if best.visits else 0.0,
+        }
+        # Keep the chosen subtree, the opponent's reply will be found among its children
+        self._root = best
+        best.parent = None
+        self._node_count = self._count_nodes(best)
+        return divmod(best.move, self._size)
+
+    def _set_root(self, own: int, opp: int) -> None:
+        """
+        Re-roots the tree at the current position, reusing the subtree searched during the previous moves.
+        """
+        if self._root is not None and self._root.children:
+            for child in self._root.children:
+                if child.own == own and child.opp == opp:
+                    child.parent = None
+                    self._root = child
+                    self._node_count = self._count_nodes(child)
+                    return
+        self._root = MctsNode(own, opp, None, None)
+        self._node_count = 1
+
+    def _iterate(self) -> int:
+        """
+        Runs one selection, expansion, batched simulation and backpropagation step.
+        :return: The number of playouts run.
+        """
+        node = self._root
+        while node.children:
+            node = self._select(node)
+        if node.visits and self._can_expand():
+            self._expand(node)
+            if node.children:
+                node = self._select(node)
+
+        total, count = self._simulate(node)
+        # The result is for the player to move at the leaf, every level up the tree swaps sides
+        result = count - total
+        while node is not None:
+            node.visits += count
+            node.wins += result
+            result = count - result
+            node = node.parent
+        return count
+
+    def _can_expand(self) -> bool:
+        """
+        Checks whether the tree may grow, pruning it (at most once per move) when it reaches the node cap.
+        """
+        if self._node_count < self._max_nodes:
+            return True
+        if not self._pruned:
+            self._pruned = True
+            self._prune(self._root)
+        return self._node_count < self._max_nodes
+
+    def _select(self, node: MctsNode) -> MctsNode:
+        """
+        Picks the child with the best UCT value, plus a progressive bias from its prior.
+        """
+        log_visits = math.log(node.visits + 1)
+        best_child = None
+        best_value = float('-inf')
+        for child in node.children:
+            if child.visits:
+                value = (child.wins / child.visits + self._exploration * math.sqrt(log_visits / child.visits)
+                         + self._bias * child.prior / (child.visits + 1))
+            else:
+                value = 1000.0 + child.prior
+            if value > best_value:
+                best_value = value
+                best_child = child
+        return best_child
+
+    def _expand(self, node: MctsNode) -> None:
+        """
+        Creates the children of a leaf, scoring every move by whether it takes a corner, gives one away,
+        and how much mobility it leaves to the opponent.
+        """
+        size = self._size
+        moves = bitboard.get_moves(node.own, node.opp, size)
+        if not moves:
+            if bitboard.get_moves(node.opp, node.own, size):
+                node.children = [MctsNode(node.opp, node.own, None, node)]
+                self._node_count += 1
+            return
+        empty = ~(node.own | node.opp) & bitboard.get_full(size)
+        corners = bitboard.get_corners(size)
+        children = []
+        for square in bitboard.iter_squares(moves):
+            own, opp = bitboard.make_move(node.own, node.opp, square, size)
+            prior = -0.05 * bitboard.count(bitboard.get_moves(opp, own, size))
+            if (1 << square) & corners:
+                prior += 1.0
+            elif square in self._x_squares and empty >> self._x_squares[square] & 1:
+                prior -= 0.5
+            children.append(MctsNode(opp, own, square, node, prior))
+        node.children = children
+        self._node_count += len(children)
+
+    def _simulate(self, node: MctsNode) -> tuple:
+        """
+        Runs a batch of playouts from a node, across the worker processes if there are any.
+        :return: The sum of the results for the player to move at the node and the number of playouts.
+        """
+        if self._workers <= 0:
+            seed = self._rng.getrandbits(32)
+            return _playout_batch(node.own, node.opp, self._batch_size, seed, self._size), self._batch_size
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers)
+        futures = [self._pool.submit(_playout_batch, node.own, node.opp, self._batch_size, self._rng.getrandbits(32),
+                                     self._size)
+                   for _ in range(self._workers)]
+        return sum(future.result() for future in futures), self._batch_size * self._workers
+
+    def _prune(self, node: MctsNode) -> None:
+        """
+        Collapses the expanded nodes none of whose children were visited, turning them back into leaves.
+        """
+        if not node.children:
+            return
+        if not any(child.visits for child in node.children):
+            self._node_count -= len(node.children)
+            node.children = None
+            return
+        for child in node.children:
+            self._prune(child)
+
+    def _count_nodes(self, node: MctsNode) -> int:
+        count = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            count += 1
+            if node.children:
+                stack.extend(node.children)
+        return count
+
+
+# The memory held by a node: the object itself and its two bitboards (the other fields are small or shared)
+_NODE_SIZE = sys.getsizeof(MctsNode(0, 0, None, None)) + 2 * sys.getsizeof(bitboard.FULL)
@@ -0,0 +1,85 @@
+"""
+Exact endgame solver on bitboards: a negamax alpha-beta search to the end of the game.
+"""
+import time
+
+from domain import bitboard
+from exceptions.exceptions import SearchTimeoutException
+
+# How many nodes are searched between two checks of the deadline
+_CHECK_INTERVAL = 1024
+
+
+class _Search:
+    def __init__(self, deadline: float, size: int):
+        self.deadline = deadline
+        self.size = size
+        self.full = bitboard.get_full(size)
+        self.corners = bitboard.get_corners(size)
+        # A bound below any final disc difference
+        self.worst = -size * size - 1
+        self.nodes = 0
+
+    def negamax(self, own: int, opp: int, alpha: int, beta: int, passed: bool = False) -> int:
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % _CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeoutException('The endgame search ran out of time.')
+
+        moves = bitboard.get_moves(own, opp, self.size)
+        if not moves:
+            if passed:
+                return bitboard.count(own) - bitboard.count(opp)
+            return -self.negamax(opp, own, -beta, -alpha, True)
+
+        best = self.worst
+        for square in self.order(own, opp, moves):
+            next_own, next_opp = bitboard.make_move(own, opp, square, self.size)
+            score = -self.negamax(next_opp, next_own, -beta, -alpha)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def order(self, own: int, opp: int, moves: int) -> list:
+        squares = list(bitboard.iter_squares(moves))
+        if len(squares) < 3 or bitboard.count(~(own | opp) & self.full) < 7:
+            return squares
+        # Fastest first: the replies that leave the opponent the fewest moves are tried first
+        keyed = []
+        for square in squares:
+            next_own, next_opp = bitboard.make_move(own, opp, square, self.size)
+            corner = (1 << square) & self.corners
+            mobility = bitboard.count(bitboard.get_moves(next_opp, next_own, self.size))
+            keyed.append((mobility - (4 if corner else 0), square))
+        keyed.sort()
+        return [square for _, square in keyed]
+
+
+def solve(own: int, opp: int, deadline: float = None, size: int = 8) -> tuple:
+    """
+    Finds the best move of a position and its exact final disc difference.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param deadline: The time.perf_counter() value after which the search gives up (None for no limit).
+    :param size: The board size.
+    :return: A (square, score) pair: the best move (None if the player must pass) and the final disc
+    difference for the player to move under perfect play.
+    :raises SearchTimeoutException: If the deadline passes before the position is solved.
+    """
+    search = _Search(deadline, size)
+    moves = bitboard.get_moves(own, opp, size)
+    if not moves:
+        return None, search.negamax(own, opp, search.worst, -search.worst)
+
+    best_square = None
+    alpha = search.worst
+    for square in search.order(own, opp, moves):
+        next_own, next_opp = bitboard.make_move(own, opp, square, size)
+        score = -search.negamax(next_opp, next_own, search.worst, -alpha)
+        if best_square is None or score > alpha:
+            best_square = square
+            alpha = score
+    return best_square, alpha
@@ -0,0 +1,325 @@
+"""
+Evaluation features of positions, backed by bitboards and by line tables: the 8x8 ones are precomputed once at
+import, those of other board sizes on first use.
+
+A line (a row, a column or a diagonal of 8 cells) is indexed in base 3: cell i contributes 3 ** i for a disc of
+the player and 2 * 3 ** i for a disc of the opponent.
+"""
+from domain import bitboard
+
+LINE_LENGTH = 8
+LINE_STATES = 3 ** LINE_LENGTH
+
+# _TERNARY[bits] is the base 3 value of an 8 bit mask read as base 3 digits
+_TERNARY = tuple(sum(3 ** i for i in range(LINE_LENGTH) if bits >> i & 1) for bits in range(1 << LINE_LENGTH))
+
+
+def line_index(own: int, opp: int) -> int:
+    """
+    Computes the table index of a line.
+    :param own: The 8 bit mask of the player's discs on the line.
+    :param opp: The 8 bit mask of the opponent's discs on the line.
+    :return: The index of the line in LINE_FLIPS and LINE_STABLE.
+    """
+    return _TERNARY[own] + 2 * _TERNARY[opp]
+
+
+def _decode_line(index: int) -> tuple:
+    own = opp = 0
+    for i in range(LINE_LENGTH):
+        index, digit = divmod(index, 3)
+        if digit == 1:
+            own |= 1 << i
+        elif digit == 2:
+            opp |= 1 << i
+    return own, opp
+
+
+def _compute_line_flips(own: int, opp: int, pos: int, length: int = LINE_LENGTH) -> int:
+    flips = 0
+    for step in (1, -1):
+        line = 0
+        cell = pos + step
+        while 0 <= cell < length and opp >> cell & 1:
+            line |= 1 << cell
+            cell += step
+        if 0 <= cell < length and own >> cell & 1:
+            flips |= line
+    return flips
+
+
+def _build_line_flips() -> tuple:
+    table = []
+    for pos in range(LINE_LENGTH):
+        row = []
+        for index in range(LINE_STATES):
+            own, opp = _decode_line(index)
+            row.append(0 if (own | opp) >> pos & 1 else _compute_line_flips(own, opp, pos))
+        table.append(tuple(row))
+    return tuple(table)
+
+
+# LINE_FLIPS[pos][index] is the mask of the discs flipped along the line when the player plays on cell pos
+LINE_FLIPS = _build_line_flips()
+
+
+def _build_line_stable() -> tuple:
+    # Lines are processed from the full ones down to the empty one, so that every line reachable by
+    # playing one more disc has already been solved. A disc is stable when no sequence of discs played
+    # on the line, by either player and in any order, can ever flip it.
+    states = sorted(range(LINE_STATES), key=lambda index: -bitboard.count(sum(_decode_line(index))))
+    full = (1 << LINE_LENGTH) - 1
+    table = [0] * LINE_STATES
+    for index in states:
+        own, opp = _decode_line(index)
+        occupied = own | opp
+        stable = occupied
+        empty = full & ~occupied
+        pos = 0
+        while empty and stable:
+            if empty & 1:
+                flips = LINE_FLIPS[pos][index]
+                next_own, next_opp = own | flips | (1 << pos), opp & ~flips
+                stable &= ~flips & table[line_index(next_own, next_opp)]
+                flips = LINE_FLIPS[pos][line_index(opp, own)]
+                next_own, next_opp = own & ~flips, opp | flips | (1 << pos)
+                stable &= ~flips & table[line_index(next_own, next_opp)]
+            empty >>= 1
+            pos += 1
+        table[index] = stable
+    return tuple(table)
+
+
+# LINE_STABLE[index] is the mask of the discs (of both players) that can never be flipped along the line
+LINE_STABLE = _build_line_stable()
+
+_FIRST_COL = 0x0101010101010101
+# _COLUMN_FROM_LINE[line] spreads an 8 bit mask over the first column of a bitboard
+_COLUMN_FROM_LINE = tuple(sum(1 << (8 * i) for i in range(LINE_LENGTH) if line >> i & 1) for line in range(256))
+
+
+def _column_to_line(bits: int, col: int) -> int:
+    return (((bits >> col) & _FIRST_COL) * 0x0102040810204080 >> 56) & 0xFF
+
+
+# Lines longer than this are not solved exactly on boards other than 8x8, as a line of n cells has 3 ** n states
+_EXACT_LINE_LENGTH = 10
+
+# length -> (ternary, stable), the tables of _line_stable
+_LINE_TABLES = {}
+
+
+def _anchored_stable(length: int, own: int, opp: int) -> int:
+    # A conservative subset of the stable discs: a full line, or else the run of discs of one colour starting at
+    # each end of the line
+    occupied = own | opp
+    if occupied == (1 << length) - 1:
+        return occupied
+    stable = 0
+    for cells in (range(length), range(length - 1, -1, -1)):
+        for colour in (own, opp):
+            if colour >> cells[0] & 1:
+                for cell in cells:
+                    if not colour >> cell & 1:
+                        break
+                    stable |= 1 << cell
+    return stable
+
+
+def _build_line_tables(length: int) -> tuple:
+    # The rule of _build_line_stable, for lines of any length
+    ternary = tuple(sum(3 ** i for i in range(length) if bits >> i & 1) for bits in range(1 << length))
+    lines = [(own, opp) for own in range(1 << length) for opp in range(1 << length) if not own & opp]
+    lines.sort(key=lambda line: -bitboard.count(line[0] | line[1]))
+    table = [0] * 3 ** length
+    for own, opp in lines:
+        occupied = own | opp
+        stable = occupied
+        for pos in range(length):
+            if not stable:
+                break
+            if occupied >> pos & 1:
+                continue
+            flips = _compute_line_flips(own, opp, pos, length)
+            next_own, next_opp = own | flips | (1 << pos), opp & ~flips
+            stable &= ~flips & table[ternary[next_own] + 2 * ternary[next_opp]]
+            flips = _compute_line_flips(opp, own, pos, length)
+            next_own, next_opp = own & ~flips, opp | flips | (1 << pos)
+            stable &= ~flips & table[ternary[next_own] + 2 * ternary[next_opp]]
+        table[ternary[own] + 2 * ternary[opp]] = stable
+    return ternary, tuple(table)
+
+
+def _line_stable(length: int, own: int, opp: int) -> int:
+    # LINE_STABLE for boards other than 8x8: exact up to _EXACT_LINE_LENGTH cells, conservative beyond
+    if length > _EXACT_LINE_LENGTH:
+        return _anchored_stable(length, own, opp)
+    tables = _LINE_TABLES.get(length)
+    if tables is None:
+        tables = _LINE_TABLES[length] = _build_line_tables(length)
+    ternary, table = tables
+    return table[ternary[own] + 2 * ternary[opp]]
+
+
+# size -> (axes, edges), see _get_stability_geometry
+_STABILITY_GEOMETRIES = {}
+
+
+def _get_stability_geometry(size: int) -> tuple:
+    """
+    Gets the masks used to find the stable discs of a board size, built on first use and then shared.
+    :param size: The board size.
+    :return: An (axes, edges) pair. For each of the horizontal, vertical, diagonal and anti-diagonal axes, axes
+    holds (a direction along the axis, the cells on which a disc is shielded by the edge of the board, the mask of
+    every line along the axis). edges holds the cell indices of the top, bottom, left and right edges.
+    """
+    geometry = _STABILITY_GEOMETRIES.get(size)
+    if geometry is None:
+        cells = range(size)
+        first_row = (1 << size) - 1
+        first_col = sum(1 << (row * size) for row in cells)
+        rows = tuple(first_row << (size * row) for row in cells)
+        cols = tuple(first_col << col for col in cells)
+        diagonals = tuple(sum(1 << (row * size + row - d) for row in cells if 0 <= row - d < size)
+                          for d in range(1 - size, size))
+        anti_diagonals = tuple(sum(1 << (row * size + s - row) for row in cells if 0 <= s - row < size)
+                               for s in range(2 * size - 1))
+        side_cols = first_col | first_col << (size - 1)
+        side_rows = first_row | first_row << (size * (size - 1))
+        axes = ((0, side_cols, rows), (2, side_rows, cols), (1, side_cols | side_rows, diagonals),
+                (3, side_cols | side_rows, anti_diagonals))
+        edges = (tuple(cells), tuple(size * (size - 1) + col for col in cells),
+                 tuple(row * size for row in cells), tuple(row * size + size - 1 for row in cells))
+        geometry = _STABILITY_GEOMETRIES[size] = (axes, edges)
+    return geometry
+
+
+def get_edge_stable(own: int, opp: int, size: int = 8) -> int:
+    """
+    Computes the stable discs lying on the edges of the board. Edge discs can only be flipped along their edge,
+    so the line table gives an exact answer for them.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: The bitboard of the stable edge discs of both players.
+    """
+    if size == 8:
+        stable = LINE_STABLE[line_index(own & 0xFF, opp & 0xFF)]
+        stable |= LINE_STABLE[line_index(own >> 56, opp >> 56)] << 56
+        stable |= _COLUMN_FROM_LINE[LINE_STABLE[line_index(_column_to_line(own, 0), _column_to_line(opp, 0))]]
+        stable |= _COLUMN_FROM_LINE[LINE_STABLE[line_index(_column_to_line(own, 7), _column_to_line(opp, 7))]] << 7
+        return stable
+
+    stable = 0
+    for squares in _get_stability_geometry(size)[1]:
+        own_line = opp_line = 0
+        for i, square in enumerate(squares):
+            own_line |= (own >> square & 1) << i
+            opp_line |= (opp >> square & 1) << i
+        line_stable = _line_stable(size, own_line, opp_line)
+        for i, square in enumerate(squares):
+            if line_stable >> i & 1:
+                stable |= 1 << square
+    return stable
+
+
+def get_stable(own: int, opp: int, size: int = 8) -> int:
+    """
+    Computes a conservative set of the player's stable discs: the stable edge discs, grown inwards through every
+    disc that, along each axis, lies on a full line or touches the edge or a stable disc of the same colour.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: The bitboard of the player's stable discs.
+    """
+    occupied = own | opp
+    shielded = []
+    for direction, edge, masks in _get_stability_geometry(size)[0]:
+        full = 0
+        for mask in masks:
+            if occupied & mask == mask:
+                full |= mask
+        shielded.append((direction, full | edge))
+
+    shift = bitboard.shift
+    stable = get_edge_stable(own, opp, size) & own
+    while True:
+        grown = own
+        for direction, axis_shielded in shielded:
+            grown &= axis_shielded | shift(stable, direction, size) | shift(stable, direction + 4, size)
+        grown |= stable
+        if grown == stable:
+            return stable
+        stable = grown
+
+
+def get_mobility(own: int, opp: int, size: int = 8) -> int:
+    """
+    Computes the mobility difference, i.e. how many more legal moves the player has than the opponent.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: The mobility difference.
+    """
+    return bitboard.count(bitboard.get_moves(own, opp, size)) - bitboard.count(bitboard.get_moves(opp, own, size))
+
+
+def get_features(own: int, opp: int, size: int = 8) -> dict:
+    """
+    Computes the evaluation features of a position, each as the player's value minus the opponent's value.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: A dictionary with the disc, mobility, frontier, stable disc and corner differences.
+    """
+    count = bitboard.count
+    corners = bitboard.get_corners(size)
+    return {
+        'discs': count(own) - count(opp),
+        'mobility': get_mobility(own, opp, size),
+        'frontier': count(bitboard.get_frontier(own, opp, size)) - count(bitboard.get_frontier(opp, own, size)),
+        'stable': count(get_stable(own, opp, size)) - count(get_stable(opp, own, size)),
+        'corners': count(own & corners) - count(opp & corners),
+    }
+
+
+# The features of get_features, in the order their weights are stored in a weight file
+FEATURE_NAMES = ('discs', 'mobility', 'frontier', 'stable', 'corners')
+
+
+def get_phase(own: int, opp: int, phases: int, size: int = 8) -> int:
+    """
+    Computes the game phase of a position, the moves of a game being split into phases of equal length.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param phases: The number of phases.
+    :param size: The board size.
+    :return: The phase, from 0 (the opening) to phases - 1.
+    """
+    played = bitboard.count(own | opp) - 4
+    return min(played * phases // (size * size - 4), phases - 1)
+
+
+def get_edge_indices(own: int, opp: int, size: int = 8) -> tuple:
+    """
+    Computes the pattern index of every edge of the board, indexed in base 3 like the lines of LINE_STABLE.
+    :param own: The bitboard of the player.
+    :param opp: The bitboard of the opponent.
+    :param size: The board size.
+    :return: The indices of the top, bottom, left and right edges, each between 0 and 3 ** size - 1.
+    """
+    if size == 8:
+        return (line_index(own & 0xFF, opp & 0xFF), line_index(own >> 56, opp >> 56),
+                line_index(_column_to_line(own, 0), _column_to_line(opp, 0)),
+                line_index(_column_to_line(own, 7), _column_to_line(opp, 7)))
+
+    indices = []
+    for squares in _get_stability_geometry(size)[1]:
+        index = 0
+        for i, square in enumerate(squares):
+            if own >> square & 1:
+                index += 3 ** i
+            elif opp >> square & 1:
+                index += 2 * 3 ** i
+        indices.append(index)
+    return tuple(indices)
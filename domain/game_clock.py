@@ -0,0 +1,96 @@
+import time
+
+
+class GameClock:
+    """
+    The clock of the computer player for a whole game: a total time plus an increment added after every move.
+    It also decides how much of the remaining time a move may use.
+    """
+    # Fraction of the remaining time that a single move may never exceed
+    _MAX_SHARE = 0.4
+    # Fraction of the increment a move may always spend, even once the clock is down to its reserve
+    _INCREMENT_SHARE = 0.5
+
+    def __init__(self, total_time: float, increment: float = 0.0, reserve: float = None):
+        """
+        Constructor for GameClock class.
+        :param total_time: The number of seconds for the whole game.
+        :param increment: The number of seconds added after every move.
+        :param reserve: The number of seconds always kept back as a safety margin (5% of the total by default).
+        """
+        self._remaining = total_time
+        self._increment = increment
+        self._reserve = min(total_time * 0.05, 5.0) if reserve is None else reserve
+        self._started = None
+
+    @property
+    def remaining(self) -> float:
+        """
+        The number of seconds left, including the time spent on the move being played.
+        """
+        if self._started is None:
+            return self._remaining
+        return self._remaining - (time.perf_counter() - self._started)
+
+    @property
+    def increment(self) -> float:
+        return self._increment
+
+    @property
+    def flagged(self) -> bool:
+        """
+        True if the player ran out of time.
+        """
+        return self.remaining < 0
+
+    def start_move(self) -> None:
+        """
+        Starts counting the time of a move.
+        :return: None
+        """
+        self._started = time.perf_counter()
+
+    def end_move(self) -> float:
+        """
+        Stops counting the time of a move, charges it to the clock and adds the increment.
+        :return: The number of seconds the move took.
+        """
+        if self._started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started
+        self._started = None
+        self._remaining -= elapsed
+        if self._remaining >= 0:
+            self._remaining += self._increment
+        return elapsed
+
+    def allocate(self, legal_moves: int, empties: int) -> tuple:
+        """
+        Decides how long the current move may think. Forced moves get no time, critical midgame positions with
+        many legal moves get more than the average share.
+        :param legal_moves: The number of legal moves.
+        :param empties: The number of empty cells on the board.
+        :return: A (soft, hard) pair of seconds: the search should not start a new iteration after the soft
+        limit and must stop at the hard limit.
+        """
+        if legal_moves <= 1:
+            return 0.0, 0.0
+        available = max(self.remaining - self._reserve, 0.0)
+        # Every player plays about half of the empty cells, and the increment comes back after each of them
+        moves_left = max((empties + 1) // 2, 1)
+        base = available / moves_left + self._increment * 0.8
+
+        if empties > 44:
+            phase = 0.6
+        elif empties > 16:
+            phase = 1.4
+        else:
+            phase = 1.0
+        width = min(max(0.5 + legal_moves / 10, 0.7), 1.5)
+
+        # The increment comes back after the move, so part of it can be spent even with no time left above the
+        # reserve, as long as the clock itself does not run out
+        spare = min(self._increment * self._INCREMENT_SHARE, max(self.remaining, 0.0) * self._MAX_SHARE)
+        hard = available * self._MAX_SHARE + spare
+        soft = min(base * phase * width, hard / 2)
+        return soft, hard
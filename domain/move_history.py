@@ -0,0 +1,199 @@
+from domain import bitboard
+from domain.position import Position
+from domain.reversi_board import ReversiBoard, ReversiSymbol
+
+
+class MoveHistory:
+    """
+    The moves of a game, kept so that they can be taken back, played again and jumped to.
+
+    Every move is stored with the bitboard of the discs it flipped, so undoing or redoing it only touches those
+    discs. Every SNAPSHOT_INTERVAL plies a Position snapshot is kept as well: going to any ply restores the nearest
+    snapshot below it and replays at most SNAPSHOT_INTERVAL - 1 moves, instead of replaying the game from the start.
+    """
+    SNAPSHOT_INTERVAL = 8
+
+    def __init__(self, board: ReversiBoard, to_move: str = ReversiSymbol.BLACK.value):
+        """
+        Constructor for MoveHistory class.
+        :param board: The board the moves are played on, in its position before the first move.
+        :param to_move: The symbol of the player making the first move.
+        """
+        position = Position.from_board(board, to_move)
+        self._board = board
+        self._size = board.size
+        self._black = position.black
+        self._white = position.white
+        # (row, col, symbol, flipped discs bitboard, symbol of the player to move next) of every move, including the
+        # undone ones that can be redone
+        self._entries = []
+        # snapshot i is the position after ply i * SNAPSHOT_INTERVAL
+        self._snapshots = [position]
+        self._ply = 0
+
+    @property
+    def ply(self) -> int:
+        """
+        The number of moves played to reach the current position.
+        """
+        return self._ply
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def can_undo(self) -> bool:
+        return self._ply > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._ply < len(self._entries)
+
+    @property
+    def moves(self) -> list:
+        """
+        The (row, col, symbol) of every move, including the undone ones that can be redone.
+        """
+        return [(row, col, symbol) for row, col, symbol, _, _ in self._entries]
+
+    @property
+    def first_to_move(self) -> str:
+        """
+        The symbol of the player making the first move of the game.
+        """
+        return self._snapshots[0].to_move
+
+    @property
+    def to_move(self) -> str:
+        """
+        The symbol of the player to move in the current position: the opponent of the last mover, or the last mover
+        again if the opponent has to pass.
+        """
+        return self._entries[self._ply - 1][4] if self._ply else self.first_to_move
+
+    def record(self, row: int, col: int, symbol: str, flipped: list) -> None:
+        """
+        Records a move just played on the board. The undone moves that could have been redone are forgotten.
+        :param row: The row of the move.
+        :param col: The column of the move.
+        :param symbol: The symbol of the player who made the move.
+        :param flipped: The (row, col) cells of the discs the move flipped.
+        :return: None
+        """
+        del self._entries[self._ply:]
+        del self._snapshots[self._ply // self.SNAPSHOT_INTERVAL + 1:]
+
+        flips = 0
+        for flip_row, flip_col in flipped:
+            flips |= 1 << (flip_row * self._size + flip_col)
+        move = 1 << (row * self._size + col)
+        if symbol == ReversiSymbol.BLACK.value:
+            own, opp = self._black | flips | move, self._white & ~flips
+        else:
+            own, opp = self._white | flips | move, self._black & ~flips
+        # Like ReversiGame.is_human_turn, a player without a legal move passes back to the last mover
+        to_move = self._opponent(symbol)
+        if not bitboard.get_moves(opp, own, self._size) and bitboard.get_moves(own, opp, self._size):
+            to_move = symbol
+        self._entries.append((row, col, symbol, flips, to_move))
+        self._apply(row, col, symbol, flips)
+        self._ply += 1
+
+        if self._ply % self.SNAPSHOT_INTERVAL == 0:
+            self._snapshots.append(Position(self._black, self._white, to_move, self._size))
+
+    def undo(self):
+        """
+        Takes back the last move played.
+        :return: The (row, col, symbol) of the move taken back, or None if no move was played.
+        """
+        if not self._ply:
+            return None
+        self._ply -= 1
+        row, col, symbol, flips, _ = self._entries[self._ply]
+        self._revert(row, col, symbol, flips)
+        return row, col, symbol
+
+    def redo(self):
+        """
+        Plays again the last move taken back.
+        :return: The (row, col, symbol) of the move played again, or None if there is no move to redo.
+        """
+        if self._ply == len(self._entries):
+            return None
+        row, col, symbol, flips, _ = self._entries[self._ply]
+        self._apply(row, col, symbol, flips)
+        self._ply += 1
+        return row, col, symbol
+
+    def goto_ply(self, ply: int) -> None:
+        """
+        Sets the board to its position after a ply, stepping through the moves when they are fewer than those
+        to replay from the nearest snapshot.
+        :param ply: The ply, between 0 and the number of recorded moves.
+        :return: None
+        """
+        if not 0 <= ply <= len(self._entries):
+            raise ValueError(f'The ply must be between 0 and {len(self._entries)}, got {ply}.')
+        snapshot_ply = ply - ply % self.SNAPSHOT_INTERVAL
+        if abs(ply - self._ply) > ply - snapshot_ply:
+            position = self._snapshots[snapshot_ply // self.SNAPSHOT_INTERVAL]
+            self._board.data = position.to_board().data
+            self._black, self._white = position.black, position.white
+            self._ply = snapshot_ply
+        while self._ply > ply:
+            self.undo()
+        while self._ply < ply:
+            self.redo()
+
+    def get_position(self, ply: int) -> Position:
+        """
+        Gets the position after a ply without changing the board, replaying the moves from the nearest snapshot
+        on bitboards.
+        :param ply: The ply, between 0 and the number of recorded moves.
+        :return: The position, with the player to move as given by to_move.
+        """
+        if not 0 <= ply <= len(self._entries):
+            raise ValueError(f'The ply must be between 0 and {len(self._entries)}, got {ply}.')
+        snapshot_ply = ply - ply % self.SNAPSHOT_INTERVAL
+        position = self._snapshots[snapshot_ply // self.SNAPSHOT_INTERVAL]
+        black, white = position.black, position.white
+        for row, col, symbol, flips, _ in self._entries[snapshot_ply:ply]:
+            move = 1 << (row * self._size + col)
+            if symbol == ReversiSymbol.BLACK.value:
+                black, white = black | flips | move, white & ~flips
+            else:
+                white, black = white | flips | move, black & ~flips
+        to_move = self._entries[ply - 1][4] if ply else self.first_to_move
+        return Position(black, white, to_move, self._size)
+
+    @staticmethod
+    def _opponent(symbol: str) -> str:
+        return ReversiSymbol.BLACK.value if symbol == ReversiSymbol.WHITE.value else ReversiSymbol.WHITE.value
+
+    def _apply(self, row: int, col: int, symbol: str, flips: int) -> None:
+        # Plays a recorded move on the board and on the bitboards
+        data = self._board.data
+        data[row][col] = symbol
+        for square in bitboard.iter_squares(flips):
+            flip_row, flip_col = divmod(square, self._size)
+            data[flip_row][flip_col] = symbol
+        move = 1 << (row * self._size + col)
+        if symbol == ReversiSymbol.BLACK.value:
+            self._black, self._white = self._black | flips | move, self._white & ~flips
+        else:
+            self._white, self._black = self._white | flips | move, self._black & ~flips
+
+    def _revert(self, row: int, col: int, symbol: str, flips: int) -> None:
+        # Takes a recorded move back on the board and on the bitboards
+        data = self._board.data
+        opponent = self._opponent(symbol)
+        data[row][col] = ReversiSymbol.EMPTY.value
+        for square in bitboard.iter_squares(flips):
+            flip_row, flip_col = divmod(square, self._size)
+            data[flip_row][flip_col] = opponent
+        move = 1 << (row * self._size + col)
+        if symbol == ReversiSymbol.BLACK.value:
+            self._black, self._white = self._black & ~(flips | move), self._white | flips
+        else:
+            self._white, self._black = self._white & ~(flips | move), self._black | flips
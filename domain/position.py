@@ -0,0 +1,183 @@
+from domain.reversi_board import ReversiBoard, ReversiSymbol
+
+_BLACK_DIGITS = str.maketrans({ReversiSymbol.BLACK.value: '1', ReversiSymbol.WHITE.value: '0',
+                               ReversiSymbol.EMPTY.value: '0'})
+_WHITE_DIGITS = str.maketrans({ReversiSymbol.BLACK.value: '0', ReversiSymbol.WHITE.value: '1',
+                               ReversiSymbol.EMPTY.value: '0'})
+
+
+def _bitboard_length(size: int) -> int:
+    return (size * size + 7) // 8
+
+
+# The low bits of a packed position hold the side to move (bit 0) and the board size (the next _SIZE_BITS bits)
+_SIZE_BITS = 5
+_HEADER_BITS = _SIZE_BITS + 1
+
+
+class Position:
+    """
+    Compact, immutable snapshot of a board: one bitboard per colour plus the side to move.
+    Bit (row * size + col) of a bitboard is set when that cell holds a disc of the colour.
+
+    All of it is packed into a single int, the black bitboard above the white one above the size and the side to
+    move, so that a position held in memory costs one object and one int.
+    """
+    __slots__ = ('_packed',)
+
+    def __init__(self, black: int, white: int, to_move: str = ReversiSymbol.BLACK.value, size: int = 8):
+        """
+        Constructor for Position class.
+        :param black: The bitboard of the black discs.
+        :param white: The bitboard of the white discs.
+        :param to_move: The symbol of the player to move.
+        :param size: The number of rows (and columns) of the board.
+        """
+        if black & white:
+            raise ValueError('A cell cannot hold both a black and a white disc.')
+        if to_move not in (ReversiSymbol.BLACK.value, ReversiSymbol.WHITE.value):
+            raise ValueError(f'Invalid side to move: {to_move!r}.')
+        if not 0 < size < 1 << _SIZE_BITS:
+            raise ValueError(f'Invalid board size: {size}.')
+        if (black | white) >> (size * size):
+            raise ValueError(f'A bitboard holds discs outside the {size}x{size} board.')
+        packed = (black << (size * size) | white) << _HEADER_BITS | size << 1 | (to_move == ReversiSymbol.WHITE.value)
+        object.__setattr__(self, '_packed', packed)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Position objects are immutable.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Position objects are immutable.')
+
+    @property
+    def black(self) -> int:
+        return self._packed >> (_HEADER_BITS + self.size * self.size)
+
+    @property
+    def white(self) -> int:
+        cells = self.size * self.size
+        return (self._packed >> _HEADER_BITS) & ((1 << cells) - 1)
+
+    @property
+    def to_move(self) -> str:
+        return ReversiSymbol.WHITE.value if self._packed & 1 else ReversiSymbol.BLACK.value
+
+    @property
+    def size(self) -> int:
+        return (self._packed >> 1) & ((1 << _SIZE_BITS) - 1)
+
+    @property
+    def empties(self) -> int:
+        """
+        The number of empty cells.
+        """
+        # The two bitboards never share a cell, so the discs are the set bits above the header
+        return self.size * self.size - (self._packed >> _HEADER_BITS).bit_count()
+
+    @property
+    def player_bits(self) -> int:
+        """
+        The bitboard of the player to move.
+        """
+        return self.white if self._packed & 1 else self.black
+
+    @property
+    def opponent_bits(self) -> int:
+        """
+        The bitboard of the player waiting for their turn.
+        """
+        return self.black if self._packed & 1 else self.white
+
+    @classmethod
+    def from_board(cls, board: ReversiBoard, to_move: str = ReversiSymbol.BLACK.value) -> 'Position':
+        """
+        Builds a position from a board.
+        :param board: The board to be converted.
+        :param to_move: The symbol of the player to move.
+        :return: The position of the board.
+        """
+        # Reversed so that cell (0, 0) ends up as the least significant bit
+        cells = ''.join([''.join(row) for row in board.data])[::-1]
+        return cls(int(cells.translate(_BLACK_DIGITS), 2), int(cells.translate(_WHITE_DIGITS), 2), to_move,
+                   board.size)
+
+    def to_board(self) -> ReversiBoard:
+        """
+        Builds a board holding the discs of this position.
+        :return: A new board.
+        """
+        size = self.size
+        black = format(self.black, f'0{size * size}b')[::-1]
+        white = format(self.white, f'0{size * size}b')[::-1]
+        black_symbol, white_symbol, empty_symbol = (ReversiSymbol.BLACK.value, ReversiSymbol.WHITE.value,
+                                                    ReversiSymbol.EMPTY.value)
+        cells = [black_symbol if b == '1' else white_symbol if w == '1' else empty_symbol
+                 for b, w in zip(black, white)]
+        data = [cells[row * size:row * size + size] for row in range(size)]
+        board = ReversiBoard(size)
+        board.data = data
+        return board
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the position: the black and the white bitboards followed by the side to move, which takes
+        17 bytes on an 8x8 board. Other board sizes are prefixed with a byte holding the size.
+        :return: The serialised position.
+        """
+        size = self.size
+        length = _bitboard_length(size)
+        data = self.black.to_bytes(length, 'big') + self.white.to_bytes(length, 'big') + self.to_move.encode('ascii')
+        return data if size == 8 else bytes((size,)) + data
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Position':
+        """
+        Builds a position from the output of to_bytes.
+        :param data: The serialised position.
+        :return: The position.
+        """
+        # 8x8 positions take an odd number of bytes, the other sizes an even one
+        size = 8 if len(data) % 2 else data[0]
+        body = data if size == 8 else data[1:]
+        length = _bitboard_length(size)
+        if len(body) != 2 * length + 1:
+            raise ValueError(f'A serialised {size}x{size} position has {2 * length + 1} bytes, got {len(body)}.')
+        return cls(int.from_bytes(body[:length], 'big'), int.from_bytes(body[length:2 * length], 'big'),
+                   chr(body[-1]), size)
+
+    def get_cell_value(self, row: int, col: int) -> str:
+        """
+        Returns the value of the cell at the given row and column.
+        :param row: The row of the cell.
+        :param col: The column of the cell.
+        :return: The value of the cell.
+        """
+        bit = 1 << (row * self.size + col)
+        if self.black & bit:
+            return ReversiSymbol.BLACK.value
+        if self.white & bit:
+            return ReversiSymbol.WHITE.value
+        return ReversiSymbol.EMPTY.value
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self._packed == other._packed
+
+    def __hash__(self) -> int:
+        return hash(self._packed)
+
+    def __repr__(self) -> str:
+        size = '' if self.size == 8 else f', size={self.size}'
+        return f'Position(black={self.black:#x}, white={self.white:#x}, to_move={self.to_move!r}{size})'
+
+    def __reduce__(self):
+        # Pickle through the compact byte form so positions are cheap to send to worker processes
+        return Position.from_bytes, (self.to_bytes(),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
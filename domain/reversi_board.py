@@ -11,18 +11,64 @@ class ReversiSymbol(Enum):
     WHITE = 'O'
     EMPTY = ' '
 
+_DIRECTIONS = ((0, 1), (1, 1), (1, 0), (1, -1),
+               (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+# size -> ray table, see get_rays
+_RAYS = {}
+
+
+def get_rays(size: int) -> tuple:
+    """
+    Gets the ray table of a board size, built on first use and then shared by every board of that size.
+    rays[row][col] holds, for every direction in which at least two cells follow (row, col), a
+    (first cell, following cells) pair listing the cells in that direction up to the edge of the board.
+    Move generation walks these rays instead of checking the board bounds at every step.
+    :param size: The number of rows (and columns) of the board.
+    :return: The ray table.
+    """
+    rays = _RAYS.get(size)
+    if rays is None:
+        rays = []
+        for row in range(size):
+            row_rays = []
+            for col in range(size):
+                cell_rays = []
+                for dr, dc in _DIRECTIONS:
+                    ray = []
+                    r, c = row + dr, col + dc
+                    while 0 <= r < size and 0 <= c < size:
+                        ray.append((r, c))
+                        r, c = r + dr, c + dc
+                    if len(ray) >= 2:
+                        cell_rays.append((ray[0], tuple(ray[1:])))
+                row_rays.append(tuple(cell_rays))
+            rays.append(tuple(row_rays))
+        rays = _RAYS[size] = tuple(rays)
+    return rays
+
+
 class ReversiBoard:
-    def __init__(self):
-        self._data = []
-        for i in range(8):
-            self._data.append([' '] * 8)
-        self._data[3][3] = ReversiSymbol.WHITE.value
-        self._data[3][4] = ReversiSymbol.BLACK.value
-        self._data[4][3] = ReversiSymbol.BLACK.value
-        self._data[4][4] = ReversiSymbol.WHITE.value
+    __slots__ = ('_data', '_size')
 
-        self._directions = [(0, 1), (1, 1), (1, 0), (1, -1),
-                            (0, -1), (-1, -1), (-1, 0), (-1, 1)]
+    def __init__(self, size: int = 8):
+        """
+        Constructor for ReversiBoard class.
+        :param size: The number of rows (and columns) of the board, an even number between 4 and 26.
+        """
+        if size % 2 or not 4 <= size <= 26:
+            raise ValueError(f'The board size must be an even number between 4 and 26, got {size}.')
+        self._data = []
+        for i in range(size):
+            self._data.append([' '] * size)
+        center = size // 2
+        self._data[center - 1][center - 1] = ReversiSymbol.WHITE.value
+        self._data[center - 1][center] = ReversiSymbol.BLACK.value
+        self._data[center][center - 1] = ReversiSymbol.BLACK.value
+        self._data[center][center] = ReversiSymbol.WHITE.value
+        self._size = size
+        # Build the shared ray table of the size; boards only keep the size, so copies and pickles stay small
+        get_rays(size)
 
     @property
     def data(self):
@@ -31,6 +77,21 @@ class ReversiBoard:
     @data.setter
     def data(self, value):
         self._data = value
+        if len(value) != self._size:
+            self._size = len(value)
+            get_rays(self._size)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, data):
+        # Going through the data setter builds the ray table of the size in a process that has not used it yet
+        self._size = 0
+        self.data = data
 
     def __str__(self) -> str:
         """
@@ -38,10 +99,10 @@ class ReversiBoard:
         :return: The representation of the board.
         """
         t = Texttable()
-        header = ['/'] + list(string.ascii_uppercase[:8])
+        header = ['/'] + list(string.ascii_uppercase[:self._size])
         t.header(header)
 
-        for row in range(8):
+        for row in range(self._size):
             t.add_row([row + 1] + self._data[row])
         return t.draw()
 
@@ -50,7 +111,7 @@ class ReversiBoard:
         Returns a copy of the board.
         :return: A copy of the board.
         """
-        new_board = ReversiBoard()
+        new_board = ReversiBoard(self._size)
         new_board.data = [row[:] for row in self._data]
         return new_board
 
@@ -62,42 +123,48 @@ class ReversiBoard:
         :param symbol: The symbol of the player who made the move.
         :return: True if the move is valid, False otherwise.
         """
-        if not (0 <= row < 8 and 0 <= col < 8):
+        if not (0 <= row < self._size and 0 <= col < self._size):
             return False
 
-        if self._data[row][col] != ReversiSymbol.EMPTY.value:
+        data = self._data
+        if data[row][col] != ReversiSymbol.EMPTY.value:
             return False
 
         opp = ReversiSymbol.BLACK.value if symbol == ReversiSymbol.WHITE.value else ReversiSymbol.WHITE.value
 
-        for dr, dc in self._directions:
-            r, c = row + dr, col + dc
-            if 0 <= r < 8 and 0 <= c < 8 and self._data[r][c] == opp:
-                r, c = r + dr, c + dc
-                same_piece_end = False
-                while 0 <= r < 8 and 0 <= c < 8:
-                    if self._data[r][c] == ReversiSymbol.EMPTY.value:
-                        break
-                    if self._data[r][c] == symbol:
-                        same_piece_end = True
-                        break
-                    r, c = r + dr, c + dc
-                if same_piece_end:
+        for (r, c), rest in _RAYS[self._size][row][col]:
+            if data[r][c] != opp:
+                continue
+            for r, c in rest:
+                cell = data[r][c]
+                if cell == opp:
+                    continue
+                if cell == symbol:
                     return True
+                break
         return False
 
-    def make_move(self, row: int, col: int, symbol: str) -> None:
+    def get_valid_moves(self, symbol: str) -> list:
+        """
+        Returns a list of all the valid moves the player having a certain symbol can make.
+        :param symbol: The symbol of the player.
+        :return: A list of all the valid moves the player can make.
+        """
+        size = self._size
+        return [(row, col) for row in range(size) for col in range(size) if self.is_valid_move(row, col, symbol)]
+
+    def make_move(self, row: int, col: int, symbol: str) -> list:
         """
         Makes a move on the board.
         :param row: The row of the move.
         :param col: The column of the move.
         :param symbol: The symbol of the player who made the move.
-        :return: None
+        :return: The (row, col) cells of the flipped pieces.
         """
         if not self.is_valid_move(row, col, symbol):
             raise InvalidMoveException('Invalid move. Please try again.')
         self._data[row][col] = symbol
-        self.flip_pieces(row, col, symbol)
+        return self.flip_pieces(row, col, symbol)
 
     def get_cell_value(self, row: int, col: int) -> str:
         """
@@ -108,24 +175,32 @@ class ReversiBoard:
         """
         return self._data[row][col]
 
-    def flip_pieces(self, row: int, col: int, symbol: str) -> None:
+    def flip_pieces(self, row: int, col: int, symbol: str) -> list:
         """
         Flips all the pieces situated between the newly placed piece and another piece of the same color.
         :param row: The row of the newly placed piece.
         :param col: The column of the newly placed piece.
         :param symbol: The symbol of the piece which was placed.
-        :return: None
+        :return: The (row, col) cells of the flipped pieces.
         """
         opp = ReversiSymbol.BLACK.value if symbol == ReversiSymbol.WHITE.value else ReversiSymbol.WHITE.value
+        flipped = []
+        data = self._data
 
-        for dr, dc in self._directions:
-            r, c = row + dr, col + dc
-            squares_to_flip = []
+        for (r, c), rest in _RAYS[self._size][row][col]:
+            if data[r][c] != opp:
+                continue
             # find the opponents' pieces in this direction
-            while 0 <= r < 8 and 0 <= c < 8 and self._data[r][c] == opp:
-                squares_to_flip.append((r, c))
-                r, c = r + dr, c + dc
-            # if we reached a piece of the same color, flip the pieces
-            if 0 <= r < 8 and 0 <= c < 8 and self._data[r][c] == symbol:
-                for fr, fc in squares_to_flip:
-                    self._data[fr][fc] = symbol
+            squares_to_flip = [(r, c)]
+            for r, c in rest:
+                cell = data[r][c]
+                if cell == opp:
+                    squares_to_flip.append((r, c))
+                    continue
+                # if we reached a piece of the same color, flip the pieces
+                if cell == symbol:
+                    for fr, fc in squares_to_flip:
+                        data[fr][fc] = symbol
+                    flipped.extend(squares_to_flip)
+                break
+        return flipped
@@ -1,21 +1,49 @@
+from domain.move_history import MoveHistory
+from domain.position import Position
 from domain.reversi_board import ReversiBoard, ReversiSymbol
 from exceptions.exceptions import InvalidMoveException, NoValidMovesException
 
 
 class ReversiGame:
-    def __init__(self, human_player):
-        self._board = ReversiBoard()
+    def __init__(self, human_player, position: Position = None, size: int = 8):
+        self._board = ReversiBoard(size) if position is None else position.to_board()
         self._human_player = human_player
         self._computer_player = ReversiSymbol.BLACK.value if human_player == ReversiSymbol.WHITE.value else ReversiSymbol.WHITE.value
         self._computer_strategy = None
+        self._clock = None
+        self._last_flips = []
+        self._history = MoveHistory(self._board,
+                                    ReversiSymbol.BLACK.value if position is None else position.to_move)
 
     def set_computer_strategy(self, computer_strategy):
         self._computer_strategy = computer_strategy
 
+    def set_clock(self, clock):
+        self._clock = clock
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def computer_strategy(self):
+        return self._computer_strategy
+
     @property
     def board(self):
         return self._board
 
+    @property
+    def history(self) -> MoveHistory:
+        return self._history
+
+    @property
+    def last_flips(self) -> list:
+        """
+        The (row, col) cells of the pieces flipped by the last move.
+        """
+        return self._last_flips
+
     @property
     def human_player(self):
         return self._human_player
@@ -24,18 +52,21 @@ class ReversiGame:
     def computer_player(self):
         return self._computer_player
 
+    def get_position(self, to_move: str) -> Position:
+        """
+        Returns a compact snapshot of the current board.
+        :param to_move: The symbol of the player to move.
+        :return: The position of the game.
+        """
+        return Position.from_board(self._board, to_move)
+
     def get_valid_moves(self, symbol: str) -> list:
         """
         Returns a list of all the valid moves the player having a certain symbol can make.
         :param symbol: The symbol of the player.
         :return: A list of all the valid moves the player can make.
         """
-        valid_moves = []
-        for row in range(8):
-            for col in range(8):
-                if self.is_valid_move(row, col, symbol):
-                    valid_moves.append((row, col))
-        return valid_moves
+        return self._board.get_valid_moves(symbol)
 
     def is_valid_move(self, row: int, col: int, symbol: str) -> bool:
         """
@@ -76,20 +107,81 @@ class ReversiGame:
             raise NoValidMovesException("No valid moves for you. Skipping your turn.")
         if (row, col) not in valid_moves:
             raise InvalidMoveException("Invalid move for you.")
-        self._board.make_move(row, col, self._human_player)
+        self._last_flips = self._board.make_move(row, col, self._human_player)
+        self._history.record(row, col, self._human_player, self._last_flips)
 
     def play_computer_move(self) -> tuple:
         """
         Makes a move for the computer player using the given strategy.
         :return: The row and column of the move.
         """
+        if self._clock is not None:
+            self._clock.start_move()
         try:
             row, col = self._computer_strategy.get_move(self._board, self._computer_player)
-            self._board.make_move(row, col, self._computer_player)
+            self._last_flips = self._board.make_move(row, col, self._computer_player)
+            self._history.record(row, col, self._computer_player, self._last_flips)
         except NoValidMovesException as e:
             raise e
+        finally:
+            if self._clock is not None:
+                self._clock.end_move()
         return row, col
 
+    def is_human_turn(self) -> bool:
+        """
+        Checks whose turn it is: the opponent of the player who made the last move, unless that player has no valid
+        moves and has to pass.
+        :return: True if the human player is to move, False if the computer player is (or if the game is over).
+        """
+        black, white = ReversiSymbol.BLACK.value, ReversiSymbol.WHITE.value
+        # The history already passes back to the last mover when needed, except for a start position without moves
+        next_symbol = self._history.to_move
+        if not self.get_valid_moves(next_symbol):
+            next_symbol = white if next_symbol == black else black
+        return next_symbol == self._human_player and bool(self.get_valid_moves(next_symbol))
+
+    def undo(self) -> int:
+        """
+        Takes back the moves played since the human player's last move, that move included, so that the human
+        player is to move again. Nothing is taken back if the human player has not moved yet.
+        :return: The number of moves taken back.
+        """
+        if self._human_player not in (symbol for _, _, symbol in self._history.moves[:self._history.ply]):
+            return 0
+        count = 0
+        while True:
+            _, _, symbol = self._history.undo()
+            count += 1
+            if symbol == self._human_player:
+                break
+        self._last_flips = []
+        return count
+
+    def redo(self) -> int:
+        """
+        Plays again the human player's next move taken back and the computer player's replies to it.
+        :return: The number of moves played again.
+        """
+        count = 0
+        moves = self._history.moves
+        while self._history.can_redo:
+            if count and moves[self._history.ply][2] == self._human_player:
+                break
+            self._history.redo()
+            count += 1
+        self._last_flips = []
+        return count
+
+    def goto_ply(self, ply: int) -> None:
+        """
+        Sets the board to its position after a number of moves of the game.
+        :param ply: The number of moves, between 0 and the number of recorded moves.
+        :return: None
+        """
+        self._history.goto_ply(ply)
+        self._last_flips = []
+
     def get_score(self) -> dict:
         """
         Returns the score of the game for the human player and the computer player.
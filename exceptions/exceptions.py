@@ -12,4 +12,12 @@ class NoValidMovesException(Exception):
         Exception raised when there are no valid moves for a player
         :param message: The message to be displayed
         """
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class SearchTimeoutException(Exception):
+    def __init__(self, message: str) -> None:
+        """
+        Exception raised when a search runs out of the time it was given
+        :param message: The message to be displayed
+        """
+        super().__init__(message)
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+
+from domain.position import Position
+
+
+class EvaluationCache:
+    """
+    Persistent position -> (depth, score, best move) store kept in an SQLite database in WAL mode, so that
+    several processes can read and write it at the same time and the results survive a restart.
+    When the store grows past its size, the shallowest and least recently used entries are evicted first.
+    """
+    _EVICTION_CHECK = 256
+
+    def __init__(self, file_name: str, max_entries: int = 100000):
+        """
+        Constructor for EvaluationCache class.
+        :param file_name: The path of the database file (created if missing).
+        :param max_entries: The number of positions kept on disk.
+        """
+        self._file_name = file_name
+        self._max_entries = max_entries
+        # The connection of every thread, and the process it was opened in
+        self._local = threading.local()
+        self._writes = 0
+        # key -> time of the entries read since the last write, whose use times are refreshed with the next write
+        self._used = {}
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # A connection must neither cross a fork nor be used by another thread than the one that opened it, so every
+        # thread of every process opens its own
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self._file_name, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS positions ('
+                               'key BLOB PRIMARY KEY, depth INTEGER NOT NULL, score REAL NOT NULL, '
+                               'move INTEGER NOT NULL, used REAL NOT NULL) WITHOUT ROWID')
+            connection.execute('CREATE INDEX IF NOT EXISTS positions_eviction ON positions (depth, used)')
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    @staticmethod
+    def _key(position: Position, namespace: str) -> bytes:
+        # Results of differently configured searches are kept apart by prefixing the namespace to the position
+        key = position.to_bytes()
+        return namespace.encode() + b'|' + key if namespace else key
+
+    def get(self, position: Position, namespace: str = ''):
+        """
+        Looks a position up.
+        :param position: The position.
+        :param namespace: The configuration of the evaluation the result must come from ('' for the default one).
+        :return: A (depth, score, best move) tuple, the move being a (row, col) tuple or None, or None if the
+        position is not stored. The score is from the point of view of the player to move.
+        """
+        key = self._key(position, namespace)
+        row = self._db.execute('SELECT depth, score, move FROM positions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        # Updating the use time here would turn every read into a write that waits for the writer lock
+        self._used[key] = time.time()
+        depth, score, move = row
+        return depth, score, divmod(move, position.size) if move >= 0 else None
+
+    def put(self, position: Position, depth: int, score: float, move, namespace: str = '') -> None:
+        """
+        Stores the result of a search, unless a deeper result is already stored for the position.
+        :param position: The position.
+        :param depth: The depth of the search.
+        :param score: The score, from the point of view of the player to move.
+        :param move: The best move as a (row, col) tuple, or None.
+        :param namespace: The configuration of the evaluation the result comes from ('' for the default one).
+        """
+        square = move[0] * position.size + move[1] if move is not None else -1
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            self._write_used()
+            db.execute('INSERT INTO positions (key, depth, score, move, used) VALUES (?, ?, ?, ?, ?) '
+                       'ON CONFLICT (key) DO UPDATE SET depth = excluded.depth, score = excluded.score, '
+                       'move = excluded.move, used = excluded.used WHERE excluded.depth >= positions.depth',
+                       (self._key(position, namespace), depth, score, square, time.time()))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % self._EVICTION_CHECK == 0:
+            self.evict()
+
+    def _write_used(self) -> None:
+        # Writes the use times of the entries read since the last write
+        if self._used:
+            used, self._used = self._used, {}
+            self._db.executemany('UPDATE positions SET used = ? WHERE key = ?',
+                                 [(when, key) for key, when in used.items()])
+
+    def evict(self) -> None:
+        """
+        Removes the shallowest, least recently used entries until the store fits its size.
+        """
+        self._write_used()
+        size = len(self)
+        if size > self._max_entries:
+            self._db.execute('DELETE FROM positions WHERE key IN '
+                             '(SELECT key FROM positions ORDER BY depth, used LIMIT ?)', (size - self._max_entries,))
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        self._db.execute('DELETE FROM positions')
+
+    def close(self) -> None:
+        """
+        Closes the connection of this thread, keeping the entries on disk.
+        """
+        local = self._local
+        if getattr(local, 'pid', None) == os.getpid():
+            self._write_used()
+            local.connection.close()
+        local.__dict__.clear()
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+
+    def __getstate__(self):
+        # Worker processes receive the file name and open their own connection
+        return {'_file_name': self._file_name, '_max_entries': self._max_entries, '_writes': 0, '_used': {}}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
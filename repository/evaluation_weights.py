@@ -0,0 +1,105 @@
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+
+from domain.evaluation import FEATURE_NAMES, get_edge_indices, get_features, get_phase
+
+_MAGIC = b'RVW1'
+# magic, board size, number of phases, number of features, number of edge patterns, all little-endian
+_HEADER = struct.Struct('<4sBBHI')
+
+
+class EvaluationWeights:
+    """
+    Evaluation weights fitted offline by tools/train_weights.py and read from a compact binary file of 32-bit
+    floats. The file is memory-mapped, so loading it costs next to nothing and processes share its pages.
+
+    For every game phase the file holds one weight per feature of FEATURE_NAMES followed by one weight per edge
+    pattern. A position scores the weighted sum of its features plus the weights of the patterns of its four edges.
+    """
+
+    def __init__(self, file_name: str):
+        """
+        Constructor for EvaluationWeights class.
+        :param file_name: The path of the weight file.
+        """
+        with open(file_name, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, size, phases, features, patterns = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = None
+        if (magic != _MAGIC or features != len(FEATURE_NAMES) or patterns != 3 ** size
+                or len(self._map) != _HEADER.size + 4 * phases * (features + patterns)):
+            self._map.close()
+            raise ValueError(f'{file_name} is not a valid weight file.')
+
+        weights = memoryview(self._map)[_HEADER.size:].cast('f')
+        if sys.byteorder != 'little':
+            weights = array('f', weights)
+            weights.byteswap()
+        self._weights = weights
+        self._digest = hashlib.sha1(self._map).hexdigest()[:16]
+        self._size = size
+        self._phases = phases
+        self._stride = features + patterns
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def phases(self) -> int:
+        return self._phases
+
+    @property
+    def digest(self) -> str:
+        """
+        A short digest of the weight file, telling apart the results of searches using different weights.
+        """
+        return self._digest
+
+    def evaluate(self, own: int, opp: int) -> float:
+        """
+        Scores a position.
+        :param own: The bitboard of the player.
+        :param opp: The bitboard of the opponent.
+        :return: The expected final disc difference, from the point of view of the player.
+        """
+        weights = self._weights
+        base = get_phase(own, opp, self._phases, self._size) * self._stride
+        features = get_features(own, opp, self._size)
+        score = 0.0
+        for name in FEATURE_NAMES:
+            score += weights[base] * features[name]
+            base += 1
+        for index in get_edge_indices(own, opp, self._size):
+            score += weights[base + index]
+        return score
+
+    def close(self) -> None:
+        if isinstance(self._weights, memoryview):
+            self._weights.release()
+        self._map.close()
+
+
+def save_weights(file_name: str, size: int, phases: int, weights) -> None:
+    """
+    Writes a weight file.
+    :param file_name: The path of the weight file.
+    :param size: The board size the weights were fitted for.
+    :param phases: The number of game phases.
+    :param weights: The weights of every phase in turn, each phase holding one weight per feature of FEATURE_NAMES
+    followed by 3 ** size edge pattern weights.
+    """
+    values = array('f', weights)
+    patterns = 3 ** size
+    if len(values) != phases * (len(FEATURE_NAMES) + patterns):
+        raise ValueError(f'Expected {phases * (len(FEATURE_NAMES) + patterns)} weights, got {len(values)}.')
+    if sys.byteorder != 'little':
+        values.byteswap()
+    with open(file_name, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, size, phases, len(FEATURE_NAMES), patterns))
+        values.tofile(file)
@@ -0,0 +1,86 @@
+import hashlib
+
+
+class ProbCutParameters:
+    """
+    The regressions used by ProbCut, read from and written to a properties file. For some search depths d, the
+    score of a d-ply search is predicted from a shallower search as slope * shallow score + intercept, with the
+    given standard deviation of the error. A line of the file holds one depth pair:
+
+        <deep depth>_<shallow depth> = <slope> <intercept> <standard deviation>
+
+    A threshold line sets how many standard deviations outside the window a prediction must fall for the node
+    to be cut.
+    """
+
+    def __init__(self, pairs: dict, threshold: float = 1.5):
+        """
+        Constructor for ProbCutParameters class.
+        :param pairs: A dictionary mapping a deep search depth to a (shallow depth, slope, intercept, standard
+        deviation) tuple.
+        :param threshold: The number of standard deviations of the cut test.
+        """
+        self._pairs = dict(pairs)
+        self._threshold = threshold
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def pairs(self) -> dict:
+        return dict(self._pairs)
+
+    @property
+    def digest(self) -> str:
+        """
+        A short digest of the parameters, telling apart the results of searches using different ones.
+        """
+        return hashlib.sha1(repr((sorted(self._pairs.items()), self._threshold)).encode()).hexdigest()[:16]
+
+    def get(self, depth: int):
+        """
+        Gets the regression of a search depth.
+        :param depth: The depth of the deep search.
+        :return: A (shallow depth, slope, intercept, standard deviation) tuple, or None if there is no regression
+        for the depth.
+        """
+        return self._pairs.get(depth)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """
+        Reads the parameters from a properties file.
+        :param file_name: The path of the file.
+        :return: The parameters.
+        """
+        pairs = {}
+        threshold = 1.5
+        with open(file_name, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                key, value = (part.strip() for part in line.split('=', 1))
+                if key == 'threshold':
+                    threshold = float(value)
+                    continue
+                deep, shallow = (int(depth) for depth in key.split('_'))
+                slope, intercept, deviation = (float(number) for number in value.split())
+                if shallow >= deep or slope <= 0 or deviation <= 0:
+                    raise ValueError(f'Invalid ProbCut regression in {file_name}: {line}')
+                pairs[deep] = (shallow, slope, intercept, deviation)
+        return cls(pairs, threshold)
+
+    def save(self, file_name: str) -> None:
+        """
+        Writes the parameters to a properties file.
+        :param file_name: The path of the file.
+        :return: None
+        """
+        with open(file_name, 'w') as file:
+            file.write('# ProbCut regressions fitted by python -m tools.fit_probcut\n')
+            file.write('# <deep depth>_<shallow depth> = <slope> <intercept> <standard deviation>\n')
+            file.write(f'threshold = {self._threshold}\n')
+            for deep, (shallow, slope, intercept, deviation) in sorted(self._pairs.items()):
+                file.write(f'{deep}_{shallow} = {slope:.4f} {intercept:.4f} {deviation:.4f}\n')
@@ -1,21 +1,52 @@
-from domain.computer_strategy import ComputerStrategy, ComputerMediumStrategy, ComputerHardStrategy
+from domain.computer_strategy import ComputerStrategy, ComputerMediumStrategy, ComputerHardStrategy, \
+    ComputerMctsStrategy
+from domain.game_clock import GameClock
+from domain.position import Position
 from domain.reversi_game import ReversiGame
+from repository.evaluation_cache import EvaluationCache
+from repository.evaluation_weights import EvaluationWeights
+from repository.probcut_parameters import ProbCutParameters
 
 
 class Service:
-    def __init__(self, human_player: str, strategy: str):
+    def __init__(self, human_player: str, strategy: str, position: Position = None, time_limit: float = 1.0,
+                 workers: int = 0, cache_file: str = None, cache_size: int = 100000, time_per_game: float = 0,
+                 time_increment: float = 0, board_size: int = 8, weights_file: str = None,
+                 probcut_file: str = None, late_move_reductions: bool = False):
         """
         Initialize the service with the human player and the strategy for the computer player
         :param human_player: The human player
         :param strategy: The strategy for the computer player
-        """
-        self._game = ReversiGame(human_player)
+        :param position: The position to start from (the standard opening if None)
+        :param time_limit: The number of seconds the mcts strategy may think per move
+        :param workers: The number of worker processes running the mcts playouts (0 runs them in this process)
+        :param cache_file: The file of the persistent evaluation cache shared by the searches (None for no cache)
+        :param cache_size: The number of positions kept in the evaluation cache
+        :param time_per_game: The number of seconds on the computer player's clock for the whole game (0 for an
+        untimed game, where the strategies use a fixed depth or time per move)
+        :param time_increment: The number of seconds added to the computer player's clock after each move
+        :param board_size: The number of rows (and columns) of the board, ignored when a position is given
+        :param weights_file: The file of the evaluation weights trained for the medium strategy (None for its
+        built-in evaluation)
+        :param probcut_file: The file of the ProbCut regressions of the medium strategy (None to disable ProbCut)
+        :param late_move_reductions: True for the medium strategy to search late moves one ply shallower
+        """
+        self._game = ReversiGame(human_player, position, board_size)
+        if time_per_game > 0:
+            self._game.set_clock(GameClock(time_per_game, time_increment))
         if strategy == 'easy':
             self._game.set_computer_strategy(ComputerStrategy(self._game))
         elif strategy == 'medium':
-            self._game.set_computer_strategy(ComputerMediumStrategy(self._game))
+            cache = EvaluationCache(cache_file, cache_size) if cache_file else None
+            weights = EvaluationWeights(weights_file) if weights_file else None
+            probcut = ProbCutParameters.load(probcut_file) if probcut_file else None
+            self._game.set_computer_strategy(ComputerMediumStrategy(self._game, cache=cache, weights=weights,
+                                                                    probcut=probcut,
+                                                                    late_move_reductions=late_move_reductions))
         elif strategy == 'hard':
             self._game.set_computer_strategy(ComputerHardStrategy(self._game))
+        elif strategy == 'mcts':
+            self._game.set_computer_strategy(ComputerMctsStrategy(self._game, time_limit, workers))
 
     def get_board(self) -> list:
         """
@@ -24,6 +55,14 @@ class Service:
         """
         return self._game.board
 
+    def get_position(self, to_move: str = None) -> Position:
+        """
+        Get a compact snapshot of the current game board
+        :param to_move: The symbol of the player to move (the human player if None)
+        :return: The position of the game
+        """
+        return self._game.get_position(to_move or self._game.human_player)
+
     def is_valid_human_move(self, row: int, col: int) -> bool:
         """
         Check if the move the human player wants to make is valid
@@ -102,6 +141,71 @@ class Service:
         """
         return self._game.play_computer_move()
 
+    def is_human_turn(self) -> bool:
+        """
+        Checks if the human player is to move
+        :return: True if the human player is to move, False if the computer player is or the game is over
+        """
+        return self._game.is_human_turn()
+
+    def undo(self) -> int:
+        """
+        Takes back the human player's last move and the computer player's replies to it
+        :return: The number of moves taken back (0 if the human player has not moved yet)
+        """
+        return self._game.undo()
+
+    def redo(self) -> int:
+        """
+        Plays again the human player's next move taken back and the computer player's replies to it
+        :return: The number of moves played again (0 if there is nothing to redo)
+        """
+        return self._game.redo()
+
+    def goto_ply(self, ply: int) -> None:
+        """
+        Sets the board to its position after a number of moves, keeping the later moves so they can be redone
+        :param ply: The number of moves, between 0 and the number of recorded moves
+        :return: None
+        """
+        self._game.goto_ply(ply)
+
+    def get_ply(self) -> int:
+        """
+        Gets the number of moves played to reach the current position
+        :return: The number of moves
+        """
+        return self._game.history.ply
+
+    def get_history_length(self) -> int:
+        """
+        Gets the number of recorded moves, including the ones taken back that can be redone
+        :return: The number of moves
+        """
+        return len(self._game.history)
+
+    def get_last_flips(self) -> list:
+        """
+        Gets the cells of the pieces flipped by the last move
+        :return: A list of (row, col) tuples
+        """
+        return self._game.last_flips
+
+    def get_computer_stats(self) -> dict:
+        """
+        Gets the statistics the computer strategy reports about its last search
+        :return: A dictionary of statistics (empty if the strategy reports none)
+        """
+        return getattr(self._game.computer_strategy, 'stats', {})
+
+    def get_computer_time_left(self):
+        """
+        Gets the number of seconds left on the computer player's clock
+        :return: The number of seconds, or None if the game is untimed
+        """
+        clock = self._game.clock
+        return clock.remaining if clock is not None else None
+
     def is_game_over(self) -> bool:
         """
         Checks if the game is over
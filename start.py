@@ -19,6 +19,17 @@ def start():
     settings = read_settings('settings.properties')
     difficulty = settings['difficulty'].lower()
     ui = settings['ui'].lower()
+    time_limit = float(settings.get('mcts_time_limit', 1.0))
+    workers = int(settings.get('mcts_workers', 0))
+    cache_file = settings.get('cache_file') or None
+    cache_size = int(settings.get('cache_size', 100000))
+    time_per_game = float(settings.get('time_per_game', 0))
+    time_increment = float(settings.get('time_increment', 0))
+    board_size = int(settings.get('board_size', 8))
+    weights_file = settings.get('weights_file') or None
+    probcut = settings.get('probcut', 'false').lower() == 'true'
+    probcut_file = (settings.get('probcut_file') or None) if probcut else None
+    late_move_reductions = settings.get('late_move_reductions', 'false').lower() == 'true'
 
     print('Welcome to Reversi Game!')
     human_player = 'X' if random.choice([True, False]) else 'O'
@@ -29,14 +40,21 @@ def start():
         computer_player = 'X'
         print("You are White ('O'). The computer goes first.")
 
-    if difficulty not in ['easy', 'medium', 'hard']:
+    if difficulty not in ['easy', 'medium', 'hard', 'mcts']:
         print("Invalid difficulty level. Please check the settings.properties file.")
         return
     if ui not in ['console', 'graphic']:
         print("Invalid UI. Please check the settings.properties file.")
         return
+    if board_size % 2 or not 4 <= board_size <= 26:
+        print("Invalid board size. Please check the settings.properties file.")
+        return
 
-    service = Service(human_player, difficulty)
+    service = Service(human_player, difficulty, time_limit=time_limit, workers=workers,
+                      cache_file=cache_file, cache_size=cache_size, time_per_game=time_per_game,
+                      time_increment=time_increment, board_size=board_size,
+                      weights_file=weights_file, probcut_file=probcut_file,
+                      late_move_reductions=late_move_reductions)
     if ui == 'console':
         ui = ConsoleUi(service)
         ui.play()
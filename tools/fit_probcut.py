@@ -0,0 +1,80 @@
+"""
+Fits the ProbCut regressions of the medium strategy.
+
+    python -m tools.fit_probcut --positions 300 --pairs 3:1,4:2,5:3 --out probcut.properties
+
+Positions are collected from random games. Each one is searched to both depths of every pair with plain
+alpha-beta, and the deep score is regressed on the shallow one by least squares. The standard deviation of the
+residuals tells ProbCut how far a prediction must fall outside the window before a node is cut. The
+regressions depend on the evaluation, so they have to be fitted again with --weights after training new weights.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from domain.computer_strategy import ComputerMediumStrategy
+from domain.reversi_game import ReversiGame
+from repository.evaluation_weights import EvaluationWeights
+from repository.probcut_parameters import ProbCutParameters
+
+
+def collect_positions(count: int, size: int, seed: int) -> list:
+    """
+    Plays random games and keeps one position of each, at a random point of the midgame.
+    :return: A list of (board, symbol to move) pairs.
+    """
+    rng = random.Random(seed)
+    game = ReversiGame('X', size=size)
+    positions = []
+    while len(positions) < count:
+        board = game.board.copy()
+        symbol = 'X'
+        for _ in range(rng.randrange(4, size * size - 16)):
+            moves = board.get_valid_moves(symbol)
+            if not moves:
+                break
+            board.make_move(*rng.choice(moves), symbol)
+            symbol = 'O' if symbol == 'X' else 'X'
+        else:
+            if board.get_valid_moves(symbol):
+                positions.append((board, symbol))
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fits the ProbCut regressions of the medium strategy.')
+    parser.add_argument('--out', default='probcut.properties', help='properties file to write')
+    parser.add_argument('--positions', type=int, default=300)
+    parser.add_argument('--pairs', default='3:1,4:2,5:3', help='comma separated deep:shallow depth pairs')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='standard deviations outside the window needed to cut')
+    parser.add_argument('--weights', help='weight file of the evaluation the searches will use')
+    parser.add_argument('--size', type=int, default=8, help='board size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = [tuple(int(depth) for depth in pair.split(':')) for pair in args.pairs.split(',')]
+    game = ReversiGame('O', size=args.size)
+    weights = EvaluationWeights(args.weights) if args.weights else None
+    strategy = ComputerMediumStrategy(game, weights=weights)
+    positions = collect_positions(args.positions, args.size, args.seed)
+
+    regressions = {}
+    for deep, shallow in pairs:
+        start = time.perf_counter()
+        shallow_scores = [strategy.minimax(board, shallow, True, symbol) for board, symbol in positions]
+        deep_scores = [strategy.minimax(board, deep, True, symbol) for board, symbol in positions]
+        slope, intercept = statistics.linear_regression(shallow_scores, deep_scores)
+        residuals = [d - (slope * s + intercept) for s, d in zip(shallow_scores, deep_scores)]
+        deviation = statistics.pstdev(residuals)
+        regressions[deep] = (shallow, slope, intercept, deviation)
+        print(f'{deep}:{shallow}  deep = {slope:.3f} * shallow {intercept:+.3f}, standard deviation '
+              f'{deviation:.3f} ({time.perf_counter() - start:.0f} s)')
+
+    ProbCutParameters(regressions, args.threshold).save(args.out)
+    print(f'Wrote {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Offline training of the evaluation weights of the medium strategy.
+
+    python -m tools.train_weights generate --games 2000 --data training_data
+    python -m tools.train_weights fit --data training_data --out weights.bin
+
+generate plays games against itself and labels their positions with exact endgame results: once a game gets down
+to a few empty cells, the position is solved, every earlier position is labelled with that result and the rest of
+the game is played out perfectly, every position being labelled with its own solved score. The features of the
+positions are written to disk as chunks of NumPy arrays while the games are played, so memory use does not grow
+with the number of games.
+
+fit streams over the chunks and fits the weights of every game phase by minibatch stochastic gradient descent on
+the squared error. The edge patterns make the problem sparse: each position only touches four of their weights.
+
+Only this tool needs NumPy. The game reads the weight file it writes with the standard library
+(see repository/evaluation_weights.py).
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+import numpy as np
+
+from domain import bitboard, endgame
+from domain.evaluation import FEATURE_NAMES, get_edge_indices, get_features, get_phase
+from repository.evaluation_weights import EvaluationWeights, save_weights
+
+
+def choose_move(own: int, opp: int, moves: int, rng: random.Random, epsilon: float, weights, size: int) -> int:
+    """
+    Chooses a self-play move: a random one with probability epsilon, otherwise the best one after a one-ply
+    search, scored with the weights if there are any and with the mobility and corners otherwise.
+    :param own: The bitboard of the player to move.
+    :param opp: The bitboard of the opponent.
+    :param moves: The bitboard of the legal moves.
+    :param rng: The random generator.
+    :param epsilon: The share of random moves.
+    :param weights: The EvaluationWeights of a previous training run, or None.
+    :param size: The board size.
+    :return: The square of the move.
+    """
+    squares = list(bitboard.iter_squares(moves))
+    if rng.random() < epsilon:
+        return rng.choice(squares)
+    corners = bitboard.get_corners(size)
+    best_square, best_score = squares[0], float('-inf')
+    for square in squares:
+        next_own, next_opp = bitboard.make_move(own, opp, square, size)
+        if weights is not None:
+            score = -weights.evaluate(next_opp, next_own)
+        else:
+            score = -bitboard.count(bitboard.get_moves(next_opp, next_own, size))
+            score += 10 * bitboard.count(next_own & corners)
+        # Random tie breaks keep the games apart
+        score += rng.random() * 1e-3
+        if score > best_score:
+            best_square, best_score = square, score
+    return best_square
+
+
+def play_game(rng: random.Random, size: int, solve_empties: int, epsilon: float, weights) -> list:
+    """
+    Plays one self-play game.
+    :return: A list of (own, opp, label) tuples, one per position with a legal move, the label being the final
+    disc difference from the point of view of the player to move.
+    """
+    center = size // 2
+    own = 1 << ((center - 1) * size + center) | 1 << (center * size + center - 1)
+    opp = 1 << ((center - 1) * size + center - 1) | 1 << (center * size + center)
+    full = bitboard.get_full(size)
+    # (own, opp, side) of the positions waiting for the solved result, side being 0 for black to move
+    pending = []
+    samples = []
+    side = 0
+    solved = None
+    while True:
+        moves = bitboard.get_moves(own, opp, size)
+        if not moves:
+            if not bitboard.get_moves(opp, own, size):
+                break
+            own, opp, side = opp, own, side ^ 1
+            continue
+
+        if bitboard.count(~(own | opp) & full) <= solve_empties:
+            square, score = endgame.solve(own, opp, size=size)
+            if solved is None:
+                # The result of the game from black's point of view, reached by perfect play from here
+                solved = score if side == 0 else -score
+            samples.append((own, opp, score))
+        else:
+            square = choose_move(own, opp, moves, rng, epsilon, weights, size)
+            pending.append((own, opp, side))
+        own, opp = bitboard.make_move(own, opp, square, size)
+        own, opp, side = opp, own, side ^ 1
+
+    if solved is None:
+        # The game ended before it could be solved
+        solved = bitboard.count(own) - bitboard.count(opp)
+        if side:
+            solved = -solved
+    samples.extend((own, opp, solved if side == 0 else -solved) for own, opp, side in pending)
+    return samples
+
+
+def write_chunk(data: str, index: int, samples: list, size: int, phases: int) -> None:
+    features = np.empty((len(samples), len(FEATURE_NAMES)), dtype=np.float32)
+    patterns = np.empty((len(samples), 4), dtype=np.int32)
+    sample_phases = np.empty(len(samples), dtype=np.int8)
+    labels = np.empty(len(samples), dtype=np.float32)
+    for i, (own, opp, label) in enumerate(samples):
+        values = get_features(own, opp, size)
+        features[i] = [values[name] for name in FEATURE_NAMES]
+        patterns[i] = get_edge_indices(own, opp, size)
+        sample_phases[i] = get_phase(own, opp, phases, size)
+        labels[i] = label
+    np.savez(os.path.join(data, f'chunk_{index:05d}.npz'), features=features, patterns=patterns,
+             phases=sample_phases, labels=labels, size=size, phase_count=phases)
+
+
+def generate(args) -> None:
+    os.makedirs(args.data, exist_ok=True)
+    # New chunks are added after the existing ones, with their own seeds
+    index = len(glob.glob(os.path.join(args.data, 'chunk_*.npz')))
+    rng = random.Random(args.seed + index)
+    weights = EvaluationWeights(args.weights) if args.weights else None
+    samples = []
+    start = time.perf_counter()
+    for game in range(1, args.games + 1):
+        samples.extend(play_game(rng, args.size, args.solve_empties, args.epsilon, weights))
+        if len(samples) >= args.chunk or game == args.games:
+            write_chunk(args.data, index, samples, args.size, args.phases)
+            print(f'{game} games, chunk {index} with {len(samples)} positions, '
+                  f'{time.perf_counter() - start:.0f} s')
+            index += 1
+            samples = []
+
+
+def load_chunks(data: str) -> list:
+    files = sorted(glob.glob(os.path.join(data, 'chunk_*.npz')))
+    if not files:
+        raise SystemExit(f'No training data in {data}.')
+    return files
+
+
+def fit(args) -> None:
+    files = load_chunks(args.data)
+    with np.load(files[0]) as chunk:
+        size, phases = int(chunk['size']), int(chunk['phase_count'])
+    patterns = 3 ** size
+    # The last chunk is held out to measure the error on positions the weights were not fitted on
+    train, validation = (files[:-1], files[-1:]) if len(files) > 1 else (files, [])
+
+    # The features are scaled to unit variance, so that one learning rate suits all of them
+    squares, count = np.zeros(len(FEATURE_NAMES)), 0
+    for file in train:
+        with np.load(file) as chunk:
+            squares += (chunk['features'].astype(np.float64) ** 2).sum(axis=0)
+            count += len(chunk['labels'])
+    scale = 1 / np.sqrt(np.maximum(squares / count, 1e-9))
+
+    feature_weights = np.zeros((phases, len(FEATURE_NAMES)))
+    pattern_weights = np.zeros((phases, patterns))
+    rng = np.random.default_rng(args.seed)
+
+    def predict(features, edge_patterns, sample_phases):
+        return ((features * scale * feature_weights[sample_phases]).sum(axis=1)
+                + pattern_weights[sample_phases[:, None], edge_patterns].sum(axis=1))
+
+    def error(files):
+        total, count = 0.0, 0
+        for file in files:
+            with np.load(file) as chunk:
+                phase_index = chunk['phases'].astype(np.intp)
+                residual = predict(chunk['features'], chunk['patterns'], phase_index) - chunk['labels']
+                total += float((residual ** 2).sum())
+                count += len(residual)
+        return np.sqrt(total / count)
+
+    for epoch in range(1, args.epochs + 1):
+        start = time.perf_counter()
+        for file in rng.permutation(train):
+            with np.load(file) as chunk:
+                features, edge_patterns = chunk['features'], chunk['patterns']
+                sample_phases, labels = chunk['phases'].astype(np.intp), chunk['labels']
+            order = rng.permutation(len(labels))
+            for batch in range(0, len(order), args.batch):
+                rows = order[batch:batch + args.batch]
+                batch_phases, batch_patterns = sample_phases[rows], edge_patterns[rows]
+                scaled = features[rows] * scale
+                residual = predict(features[rows], batch_patterns, batch_phases) - labels[rows]
+
+                gradient = np.zeros_like(feature_weights)
+                np.add.at(gradient, batch_phases, residual[:, None] * scaled)
+                feature_weights -= args.rate * (gradient / len(rows) + args.l2 * feature_weights)
+
+                # Each pattern weight moves by the average error of the positions that use it
+                gradient = np.zeros_like(pattern_weights)
+                hits = np.zeros_like(pattern_weights)
+                np.add.at(gradient, (batch_phases[:, None], batch_patterns), residual[:, None])
+                np.add.at(hits, (batch_phases[:, None], batch_patterns), 1)
+                used = hits > 0
+                pattern_weights[used] -= args.pattern_rate * (gradient[used] / hits[used]
+                                                              + args.l2 * pattern_weights[used])
+        message = f'epoch {epoch}: training error {error(train):.2f} discs'
+        if validation:
+            message += f', validation error {error(validation):.2f} discs'
+        print(f'{message} ({time.perf_counter() - start:.0f} s)')
+
+    weights = np.concatenate([feature_weights * scale, pattern_weights], axis=1)
+    save_weights(args.out, size, phases, weights.ravel().tolist())
+    print(f'Wrote {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trains the evaluation weights of the medium strategy.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_generate = commands.add_parser('generate', help='play self-play games and store their positions')
+    parser_generate.add_argument('--data', required=True, help='directory of the training chunks')
+    parser_generate.add_argument('--games', type=int, default=1000)
+    parser_generate.add_argument('--size', type=int, default=8, help='board size')
+    parser_generate.add_argument('--phases', type=int, default=6, help='number of game phases')
+    parser_generate.add_argument('--chunk', type=int, default=20000, help='positions per chunk')
+    parser_generate.add_argument('--solve-empties', type=int, default=10,
+                                 help='number of empty cells from which the games are solved exactly')
+    parser_generate.add_argument('--epsilon', type=float, default=0.25, help='share of random moves')
+    parser_generate.add_argument('--weights', help='weight file of a previous run, used to choose the moves')
+    parser_generate.add_argument('--seed', type=int, default=0)
+    parser_generate.set_defaults(run=generate)
+
+    parser_fit = commands.add_parser('fit', help='fit the weights to the stored positions')
+    parser_fit.add_argument('--data', required=True, help='directory of the training chunks')
+    parser_fit.add_argument('--out', required=True, help='weight file to write')
+    parser_fit.add_argument('--epochs', type=int, default=20)
+    parser_fit.add_argument('--batch', type=int, default=256)
+    parser_fit.add_argument('--rate', type=float, default=0.01, help='learning rate of the features')
+    parser_fit.add_argument('--pattern-rate', type=float, default=0.05, help='learning rate of the edge patterns')
+    parser_fit.add_argument('--l2', type=float, default=1e-4, help='weight decay')
+    parser_fit.add_argument('--seed', type=int, default=0)
+    parser_fit.set_defaults(run=fit)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
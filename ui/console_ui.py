@@ -1,3 +1,5 @@
+import string
+
 from exceptions.exceptions import InvalidMoveException, NoValidMovesException
 from service.service import Service
 
@@ -13,18 +15,58 @@ class ConsoleUi:
         score = self._service.get_score()
         print(f"Black (X): {score['X']} \nWhite (O): {score['O']}")
 
+    def print_computer_stats(self):
+        stats = self._service.get_computer_stats()
+        if 'playouts' in stats:
+            print(f"{stats['playouts']} playouts ({stats['playouts_per_second']:.0f}/s), "
+                  f"{stats['tree_nodes']} tree nodes ({stats['tree_memory'] / 1024:.0f} KiB)")
+        elif stats.get('cached'):
+            print(f"Reused a depth {stats['depth']} search from the evaluation cache")
+        elif 'depth' in stats:
+            print(f"Searched to depth {stats['depth']} in {stats['seconds']:.2f}s")
+        time_left = self._service.get_computer_time_left()
+        if time_left is not None:
+            print(f"Computer clock: {time_left:.1f}s left")
+
     def get_human_move(self):
+        """
+        Reads the human player's input until it is a move or a history command.
+        :return: A (row, col) move, 'UNDO', 'REDO', 'PLAY' or a ('GOTO', ply) tuple.
+        """
         while True:
             try:
                 move = input(">> ").strip().upper()
-                if len(move) != 2 or move[0] not in 'ABCDEFGH' or not move[1].isdigit():
+                if move in ('UNDO', 'REDO', 'PLAY'):
+                    return move
+                if move.startswith('GOTO'):
+                    ply = move[4:].strip()
+                    if not ply.isdigit():
+                        raise ValueError("Invalid input format. Use goto followed by a move number (e.g., goto 4).")
+                    return 'GOTO', int(ply)
+                size = self._service.get_board().size
+                if len(move) < 2 or move[0] not in string.ascii_uppercase[:size] or not move[1:].isdigit():
                     raise ValueError("Invalid input format. Use letter and number (e.g., D3).")
                 col = ord(move[0]) - ord('A')
-                row = int(move[1]) - 1
+                row = int(move[1:]) - 1
                 return row, col
             except ValueError as ve:
                 print(ve)
 
+    def play_history_command(self, command):
+        if command == 'UNDO':
+            if not self._service.undo():
+                print("There is no move of yours to take back.")
+                return
+        elif command == 'REDO':
+            if not self._service.redo():
+                print("There is no move to play again.")
+                return
+        else:
+            self._service.goto_ply(command[1])
+        print(f"Move {self._service.get_ply()} of {self._service.get_history_length()}")
+        self.print_board()
+        self.print_score()
+
     def get_winner(self):
         score = self._service.get_score()
         if self._service.get_human_player() == 'X':
@@ -44,34 +86,49 @@ class ConsoleUi:
 
     def play(self):
         self.print_board()
-
-        # Computer starts
-        if self._service.get_human_player() == 'O':
-            r, c = self._service.play_computer_move()
-            print(f'Computer moved at {chr(c + 65)}{r + 1}')
-            self.print_board()
-            self.print_score()
+        print("Enter a move (e.g., D3), or undo, redo or goto <move number>.")
 
         while not self._service.is_game_over():
             try:
+                if not self._service.is_human_turn():
+                    if self._service.get_ply() < self._service.get_history_length():
+                        # Letting the computer move here would forget the later moves, so it has to be asked for
+                        print("It is the computer's turn. Enter redo or goto <move number> to keep browsing the "
+                              "game, or play to let the computer move from here, forgetting the later moves.")
+                        command = self.get_human_move()
+                        if command != 'PLAY':
+                            if isinstance(command, str) or command[0] == 'GOTO':
+                                self.play_history_command(command)
+                            else:
+                                print("It is not your turn.")
+                            continue
+                    r, c = self._service.play_computer_move()
+                    self.print_board()
+                    print(f'Computer moved at {chr(c + 65)}{r + 1}')
+                    self.print_computer_stats()
+                    self.print_score()
+                    continue
+
                 valid_moves = self._service.get_valid_human_moves()
                 print("Your valid moves:", [f"{chr(c + 65)}{r + 1}" for r, c in valid_moves])
-                row, col = self.get_human_move()
-                self._service.play_human_move(row, col)
+                move = self.get_human_move()
+                if move == 'PLAY':
+                    print("It is your turn.")
+                    continue
+                if isinstance(move, str) or move[0] == 'GOTO':
+                    self.play_history_command(move)
+                    continue
+                self._service.play_human_move(*move)
 
                 self.print_board()
                 self.print_score()
 
-                if not self._service.is_game_over():
-                    r, c = self._service.play_computer_move()
-                    self.print_board()
-                    print(f'Computer moved at {chr(c + 65)}{r + 1}')
-                    self.print_score()
-
             except InvalidMoveException as e:
                 print(e)
             except NoValidMovesException as e:
                 print(e)
+            except ValueError as e:
+                print(e)
 
         print("Game over!")
         self.get_winner()
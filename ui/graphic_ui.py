@@ -1,3 +1,6 @@
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 
@@ -5,28 +8,55 @@ from exceptions.exceptions import NoValidMovesException
 
 
 class GraphicUi:
+    CELL_SIZE = 64
+    DISC_MARGIN = 6
+    # A flip shrinks the disc to a line and grows it back in the new colour over FLIP_FRAMES frames
+    FLIP_FRAMES = 10
+    FRAME_DELAY = 16
+    POLL_DELAY = 20
+
     def __init__(self, service):
         self._service = service
         self.board = self._service.get_board()
+        self.size = self.board.size
         self.score_label = None
+        self.status_label = None
+        self.undo_button = None
+        self.redo_button = None
+        self.goto_entry = None
+        self.goto_button = None
+        self.ply_label = None
         self.human_player = self._service.get_human_player()
         self.computer_player = self._service.get_computer_player()
-        self.buttons = []
+        self.canvas = None
+        self.cells = []
+        self.discs = []
+        # The (cell value, highlighted) state last painted on every cell
+        self._painted = []
+        self._valid_moves = set()
+        # (row, col) -> [frame, old colour, new colour] of the discs being flipped
+        self._animations = {}
+        self._animating = False
+        self._thinking = False
+        self._computer_moves = queue.Queue()
+        self._render_count = 0
+        self._render_total = 0.0
+        self._render_max = 0.0
+        self._last_render = 0.0
         self.window = tk.Tk()
         self.set_window()
-        self.create_board()
         self.create_score_label()
+        self.create_history_buttons()
+        self.create_board()
         messagebox.showinfo("Your Color",
                             f"You are {'Black. You go first.' if self.human_player == 'X' else 'White. The computer goes first.'}")
         if self.human_player == 'O':
-            self._service.play_computer_move()
-            self.update_board()
+            self.play_computer_turn()
 
     def set_window(self):
         self.window.title('Othello Game')
-        self.window.geometry('530x600')
-        window_width = 530
-        window_height = 600
+        window_width = self.size * self.CELL_SIZE + 20
+        window_height = self.size * self.CELL_SIZE + 130
         screen_width = self.window.winfo_screenwidth()
         screen_height = self.window.winfo_screenheight()
         x = int((screen_width / 2) - (window_width / 2))
@@ -35,51 +65,96 @@ class GraphicUi:
 
     def create_score_label(self):
         self.score_label = tk.Label(self.window, text='', font=('Arial', 14))
-        self.score_label.grid(row=8, column=0, columnspan=8)
+        self.score_label.grid(row=1, column=0)
+        self.status_label = tk.Label(self.window, text='', font=('Arial', 10))
+        self.status_label.grid(row=2, column=0)
         self.update_score()
 
+    def create_history_buttons(self):
+        frame = tk.Frame(self.window)
+        frame.grid(row=3, column=0, pady=5)
+        self.undo_button = tk.Button(frame, text='Undo', width=8, command=self.handle_undo)
+        self.undo_button.grid(row=0, column=0, padx=5)
+        self.redo_button = tk.Button(frame, text='Redo', width=8, command=self.handle_redo)
+        self.redo_button.grid(row=0, column=1, padx=5)
+        self.goto_entry = tk.Entry(frame, width=4)
+        self.goto_entry.grid(row=0, column=2, padx=5)
+        self.goto_entry.bind('<Return>', lambda event: self.handle_goto())
+        self.goto_button = tk.Button(frame, text='Go to', width=8, command=self.handle_goto)
+        self.goto_button.grid(row=0, column=3, padx=5)
+        self.ply_label = tk.Label(frame, text='', font=('Arial', 10))
+        self.ply_label.grid(row=0, column=4, padx=5)
+        self.window.bind('<Control-z>', lambda event: self.handle_undo())
+        self.window.bind('<Control-y>', lambda event: self.handle_redo())
+
     def create_board(self):
-        for row in range(8):
-            row_buttons = []
-            for col in range(8):
-                cell_value = self.board.get_cell_value(row, col)
-                color, state = self.get_button_properties(row, col, cell_value)
-
-                button = tk.Button(self.window, width=8, height=4, bg=color, state=state,
-                                   command=lambda r=row, c=col: self.handle_move(r, c))
-                button.grid(row=row, column=col)
-                row_buttons.append(button)
-            self.buttons.append(row_buttons)
-
-    def get_button_properties(self, row, col, cell_value):
-        # Determine the properties of the button based on the cell value
+        width = self.size * self.CELL_SIZE
+        self.canvas = tk.Canvas(self.window, width=width, height=width, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, padx=10, pady=10)
+        self.canvas.bind('<Button-1>', self.handle_click)
+
+        for row in range(self.size):
+            row_cells = []
+            row_discs = []
+            for col in range(self.size):
+                x0, y0, x1, y1 = self.get_cell_bounds(row, col)
+                row_cells.append(self.canvas.create_rectangle(x0, y0, x1, y1, outline='dark green'))
+                row_discs.append(self.canvas.create_oval(*self.get_disc_bounds(row, col), outline='', state='hidden'))
+            self.cells.append(row_cells)
+            self.discs.append(row_discs)
+            self._painted.append([None] * self.size)
+        self.update_board([(row, col) for row in range(self.size) for col in range(self.size)])
+
+    def get_cell_bounds(self, row, col):
+        x0 = col * self.CELL_SIZE
+        y0 = row * self.CELL_SIZE
+        return x0, y0, x0 + self.CELL_SIZE, y0 + self.CELL_SIZE
+
+    def get_disc_bounds(self, row, col, width=1.0):
+        # width scales the disc horizontally, for the flip animation
+        x0, y0, x1, y1 = self.get_cell_bounds(row, col)
+        center = (x0 + x1) / 2
+        radius = (self.CELL_SIZE / 2 - self.DISC_MARGIN) * width
+        return center - radius, y0 + self.DISC_MARGIN, center + radius, y1 - self.DISC_MARGIN
+
+    def get_cell_properties(self, cell_value, highlighted):
+        # Determine the background of the cell and the colour of its disc (None if the cell is empty)
         if cell_value == 'X':
-            color = 'black'
-            state = 'disabled'
+            disc = 'black'
         elif cell_value == 'O':
-            color = 'white'
-            state = 'disabled'
+            disc = 'white'
         else:
-            color = 'green'
-            state = 'normal'
-
-        if (row, col) in self._service.get_valid_human_moves():
-            color = 'light green'
+            disc = None
+        return ('light green' if highlighted else 'green'), disc
 
-        return color, state
+    def handle_click(self, event):
+        row = event.y // self.CELL_SIZE
+        col = event.x // self.CELL_SIZE
+        if 0 <= row < self.size and 0 <= col < self.size:
+            self.handle_move(row, col)
 
     def handle_move(self, row, col):
+        # Ignore clicks while the computer is thinking
+        if self._thinking:
+            return
+
         # Check if the game is over before making a move
         if self._service.is_game_over():
             self.game_over()
             return
 
+        # After a search that failed, or a jump to a position with the computer to move, a click lets the computer
+        # move (forgetting the moves after it)
+        if not self._service.is_human_turn():
+            self.play_computer_turn()
+            return
+
         # Human's turn
-        if self._service.get_valid_human_moves():
-            if self._service.is_valid_human_move(row, col):
+        if self._valid_moves:
+            if (row, col) in self._valid_moves:
                 try:
                     self._service.play_human_move(row, col)
-                    self.update_board()
+                    self.update_board([(row, col)], self._service.get_last_flips())
                 except NoValidMovesException:
                     messagebox.showinfo("No Valid Moves", "No valid moves for you. Skipping your turn.")
             else:
@@ -88,33 +163,177 @@ class GraphicUi:
         else:
             messagebox.showinfo("No Valid Moves", "No valid moves for you. Skipping your turn.")
 
-        # Check if the game is over after the human's turn
+        self.play_computer_turn()
+
+    def handle_undo(self):
+        # Take back the human player's last move together with the computer's replies
+        if self._thinking or not self._service.undo():
+            return
+        self.redraw_all()
+
+    def handle_redo(self):
+        if self._thinking or not self._service.redo():
+            return
+        self.redraw_all()
         if self._service.is_game_over():
             self.game_over()
+
+    def handle_goto(self):
+        if self._thinking:
             return
+        ply = self.goto_entry.get().strip()
+        length = self._service.get_history_length()
+        if not ply.isdigit() or int(ply) > length:
+            messagebox.showwarning("Invalid Move Number", f"Enter a move number between 0 and {length}.")
+            return
+        self._service.goto_ply(int(ply))
+        self.redraw_all()
+        if self._service.is_game_over():
+            self.game_over()
+        elif not self._service.is_human_turn():
+            # Unlike after a move of the human player, the computer waits, so that the later moves can be redone
+            self.status_label.config(text="Computer to move: click the board to let it play (forgetting the "
+                                          "later moves), or redo.")
 
-        # Computer's turn
-        if self._service.get_valid_computer_moves():
-            try:
-                self._service.play_computer_move()
-                self.update_board()
-            except NoValidMovesException:
-                messagebox.showinfo("No Valid Moves", "No valid moves for the computer. Skipping its turn.")
-        else:
+    def redraw_all(self):
+        # A jump in the history can change any cell, and no flip is animated
+        self._animations.clear()
+        self.update_board([(row, col) for row in range(self.size) for col in range(self.size)])
+
+    def play_computer_turn(self):
+        # Check if the game is over before the computer's turn
+        if self._service.is_game_over():
+            self.game_over()
+            return
+
+        if not self._service.get_valid_computer_moves():
+            messagebox.showinfo("No Valid Moves", "No valid moves for the computer. Skipping its turn.")
+            return
+
+        # The search runs on a worker thread so that the window keeps animating and responding meanwhile
+        self._thinking = True
+        self.status_label.config(text='The computer is thinking...')
+        self.update_board()
+        threading.Thread(target=self.search_computer_move, daemon=True).start()
+        self.window.after(self.POLL_DELAY, self.poll_computer_move)
+
+    def search_computer_move(self):
+        # Any error is handed to the window, which would otherwise keep waiting for a move that never comes
+        try:
+            self._computer_moves.put(self._service.play_computer_move())
+        except Exception as e:
+            self._computer_moves.put(e)
+
+    def poll_computer_move(self):
+        try:
+            result = self._computer_moves.get_nowait()
+        except queue.Empty:
+            self.window.after(self.POLL_DELAY, self.poll_computer_move)
+            return
+
+        self._thinking = False
+        if isinstance(result, NoValidMovesException):
             messagebox.showinfo("No Valid Moves", "No valid moves for the computer. Skipping its turn.")
+            self.update_board()
+        elif isinstance(result, Exception):
+            self.update_board()
+            messagebox.showerror("Computer Error", f"The computer could not move: {result}\n"
+                                                   "Click the board to let it try again.")
+            return
+        else:
+            self.update_board([result], self._service.get_last_flips())
 
-        # Final check if the game is over after the computer's move
+        # Check if the game is over after the computer's move
         if self._service.is_game_over():
             self.game_over()
+        elif not self._valid_moves:
+            messagebox.showinfo("No Valid Moves", "No valid moves for you. Skipping your turn.")
+            self.play_computer_turn()
 
-    def update_board(self):
-        for row in range(8):
-            for col in range(8):
-                cell_value = self._service.get_cell_value(row, col)
-                color, state = self.get_button_properties(row, col, cell_value)
+    def update_board(self, changed=(), flips=()):
+        """
+        Repaints the cells whose disc or legal-move highlight changed. The legal moves are generated once per
+        redraw, and the flipped discs are animated instead of repainted.
+        :param changed: The cells whose disc may have changed, besides the flipped ones.
+        :param flips: The cells of the discs flipped by the last move.
+        """
+        start = time.perf_counter()
+        valid_moves = (set(self._service.get_valid_human_moves())
+                       if not self._thinking and self._service.is_human_turn() else set())
+        dirty = set(changed) | (valid_moves ^ self._valid_moves)
+        self._valid_moves = valid_moves
 
-                self.buttons[row][col].config(bg=color, state=state)
+        flips = set(flips)
+        for row, col in dirty | flips:
+            self.paint_cell(row, col, (row, col) in flips)
         self.update_score()
+        self.update_history_buttons()
+        self.record_render_time(start)
+        if self._animations and not self._animating:
+            self._animating = True
+            self.window.after(self.FRAME_DELAY, self.animate_flips)
+
+    def paint_cell(self, row, col, flipped=False):
+        cell_value = self._service.get_cell_value(row, col)
+        state = (cell_value, (row, col) in self._valid_moves)
+        previous = self._painted[row][col]
+        if state == previous:
+            return
+        self._painted[row][col] = state
+
+        background, disc = self.get_cell_properties(*state)
+        self.canvas.itemconfig(self.cells[row][col], fill=background)
+        if flipped and previous is not None and previous[0] != cell_value:
+            old_disc = self.get_cell_properties(*previous)[1]
+            self._animations[(row, col)] = [0, old_disc, disc]
+        elif disc is None:
+            self.canvas.itemconfig(self.discs[row][col], state='hidden')
+        else:
+            self._animations.pop((row, col), None)
+            self.canvas.coords(self.discs[row][col], *self.get_disc_bounds(row, col))
+            self.canvas.itemconfig(self.discs[row][col], fill=disc, state='normal')
+
+    def animate_flips(self):
+        # One frame of every running flip animation; reschedules itself until all of them are done
+        start = time.perf_counter()
+        half = self.FLIP_FRAMES / 2
+        for (row, col), animation in list(self._animations.items()):
+            frame, old_disc, new_disc = animation
+            frame += 1
+            disc = self.discs[row][col]
+            if frame >= self.FLIP_FRAMES:
+                del self._animations[(row, col)]
+                self.canvas.coords(disc, *self.get_disc_bounds(row, col))
+                self.canvas.itemconfig(disc, fill=new_disc, state='normal')
+                continue
+            animation[0] = frame
+            self.canvas.coords(disc, *self.get_disc_bounds(row, col, max(abs(frame - half) / half, 0.05)))
+            self.canvas.itemconfig(disc, fill=old_disc if frame < half else new_disc, state='normal')
+        self.record_render_time(start)
+        if self._animations:
+            self.window.after(self.FRAME_DELAY, self.animate_flips)
+        else:
+            self._animating = False
+
+    def record_render_time(self, start):
+        elapsed = time.perf_counter() - start
+        self._render_count += 1
+        self._render_total += elapsed
+        self._render_max = max(self._render_max, elapsed)
+        self._last_render = elapsed
+        if not self._thinking:
+            self.status_label.config(text=f'Redraw {self._last_render * 1000:.1f} ms '
+                                          f'(slowest frame {self._render_max * 1000:.1f} ms)')
+
+    @property
+    def render_stats(self):
+        """
+        Statistics about the redraws and animation frames: their number and their average, slowest and last
+        duration in milliseconds.
+        """
+        average = self._render_total / self._render_count if self._render_count else 0.0
+        return {'frames': self._render_count, 'average_ms': average * 1000,
+                'max_ms': self._render_max * 1000, 'last_ms': self._last_render * 1000}
 
     def game_over(self):
         score = self._service.get_score()
@@ -130,6 +349,13 @@ class GraphicUi:
         messagebox.showinfo("Game Over", message)
         self.window.quit()
 
+    def update_history_buttons(self):
+        ply, length = self._service.get_ply(), self._service.get_history_length()
+        self.undo_button.config(state='disabled' if self._thinking or not ply else 'normal')
+        self.redo_button.config(state='disabled' if self._thinking or ply == length else 'normal')
+        self.goto_button.config(state='disabled' if self._thinking or not length else 'normal')
+        self.ply_label.config(text=f'Move {ply} of {length}')
+
     def update_score(self):
         score = self._service.get_score()
         human_score = score[self.human_player]